@@ -10,13 +10,15 @@ from ryan.config import App, Secrets
 revision = environ.get("REVISION")
 
 intents = discord.Intents.default()
-intents.members = True
+intents.members = True  # Required to fetch members, but they are not cached, see below
 
 bot = Ryan(
     command_prefix=App.prefix,
     activity=discord.Game(f"version {revision}"),
     help_command=None,
     intents=intents,
+    member_cache_flags=discord.MemberCacheFlags.none(),  # Fetch members on demand instead
+    chunk_guilds_at_startup=False,
 )
 
 # Instantiate all extensions
@@ -5,6 +5,10 @@ import aiohttp
 import arrow
 from discord.ext import commands
 
+from ryan.utils.monitor import LoopLagMonitor
+from ryan.utils.ratelimit import TracedHTTPClient
+from ryan.utils.router import MessageRouter
+
 log = logging.getLogger(__name__)
 
 
@@ -13,15 +17,45 @@ class Ryan(commands.Bot):
     Custom bot class.
 
     This holds attributes globally accessible to all cogs.
+
+    Cogs receive messages through `router` rather than by listening to `on_message` directly,
+    see `ryan.utils.router.route`.
     """
 
     http_session: aiohttp.ClientSession
+    loop_lag: LoopLagMonitor
     start_time: arrow.Arrow
 
+    def __init__(self, *args, **kwargs) -> None:
+        """Delegate to super, trace rate limits of Discord responses & start routing messages."""
+        super().__init__(*args, **kwargs)
+
+        # Nothing was requested yet, so the client can be swapped for one which traces its sessions
+        http = self.http
+        self.http = TracedHTTPClient(
+            http.connector,
+            proxy=http.proxy,
+            proxy_auth=http.proxy_auth,
+            unsync_clock=not http.use_clock,
+            loop=self.loop,
+        )
+        self._connection.http = self.http
+
+        self.router = MessageRouter()
+        self.add_listener(self.router.dispatch, "on_message")
+
     def add_cog(self, cog: commands.Cog) -> None:
-        """Log cog name & delegate to super."""
+        """Log cog name, delegate to super & route messages to its listeners."""
         log.info(f"Loading cog: {cog.qualified_name}")
         super().add_cog(cog)
+        self.router.add_cog(cog)
+
+    def remove_cog(self, name: str) -> None:
+        """Stop routing messages to the cog & delegate to super."""
+        cog = self.get_cog(name)
+        if cog is not None:
+            self.router.remove_cog(cog)
+        super().remove_cog(name)
 
     async def start(self, *args, **kwargs) -> None:
         """
@@ -36,6 +70,9 @@ class Ryan(commands.Bot):
         connector = aiohttp.TCPConnector(resolver=aiohttp.AsyncResolver(), family=socket.AF_INET)
         self.http_session = aiohttp.ClientSession(connector=connector)
 
+        self.loop_lag = LoopLagMonitor()
+        self.loop_lag.start()
+
         log.info("Ryan ready, connecting to Discord")
         await super().start(*args, **kwargs)
 
@@ -47,5 +84,7 @@ class Ryan(commands.Bot):
         """
         await super().close()
 
+        self.loop_lag.stop()
+
         log.info("Closing HTTP session")
         await self.http_session.close()
@@ -63,6 +63,7 @@ class _App(_ConfigBase):
 
     prefix: str  # Command prefix on Discord.
     log_debug: bool  # Enable DEBUG logs, otherwise INFO and above.
+    data_dir: str  # Directory for files persisted across restarts, relative to working directory.
 
 
 App = _App(section_name="app")
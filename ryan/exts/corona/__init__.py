@@ -0,0 +1,10 @@
+from ryan.bot import Ryan
+from ryan.exts.corona.cog import Corona
+from ryan.exts.corona.country import Country, CountryMap
+
+__all__ = ["Corona", "Country", "CountryMap", "setup"]
+
+
+def setup(bot: Ryan) -> None:
+    """Load Corona cog."""
+    bot.add_cog(Corona(bot))
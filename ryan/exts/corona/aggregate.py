@@ -0,0 +1,65 @@
+import logging
+import typing as t
+
+from ryan.exts.corona.country import CountryTable
+
+log = logging.getLogger(__name__)
+
+# Metrics which can be aggregated & ranked, mapped to readable names
+METRICS: t.Dict[str, str] = {
+    "confirmed": "Confirmed",
+    "confirmed_new": "New confirmed",
+    "recovered": "Recovered",
+    "recovered_new": "New recovered",
+    "deaths": "Deaths",
+    "deaths_new": "New deaths",
+    "active": "Active",
+    "confirmed_ml": "Confirmed per million",
+    "recovered_ml": "Recovered per million",
+    "deaths_ml": "Deaths per million",
+    "active_ml": "Active per million",
+}
+
+# Per-million metrics are derived from their absolute counterparts & the population
+PER_MILLION = CountryTable.DERIVED_COLUMNS
+
+
+class Aggregates:
+    """
+    Figures across all countries in a `CountryTable`, precomputed at construction.
+
+    Everything is computed column-wise, touching each column once per figure, and no `Country`
+    views are ever created. Countries with unknown population are excluded from per-million
+    figures, both from the world ratios and from the rankings.
+    """
+
+    def __init__(self, table: CountryTable) -> None:
+        """Compute totals, world per-million ratios & per-metric rankings over `table`."""
+        self.table = table
+
+        absolute = [metric for metric in METRICS if metric not in PER_MILLION]
+        self.totals: t.Dict[str, int] = {metric: table.total(metric) for metric in absolute}
+
+        # Only countries with known population contribute to the world per-million ratios
+        population = table.column("population")
+        self.population = sum(population)
+
+        for metric_ml, metric in PER_MILLION.items():
+            known = sum(value for value, pop in zip(table.column(metric), population) if pop)
+            self.totals[metric_ml] = int(known / (self.population / 1_000_000)) if self.population else -1
+
+        # Row ids ordered by descending metric value, ties broken by row order
+        self.rankings: t.Dict[str, t.List[int]] = {}
+        for metric in METRICS:
+            column = table.column(metric)
+            rows = range(len(table))
+            if metric in PER_MILLION:
+                rows = [row for row in rows if population[row]]
+            self.rankings[metric] = sorted(rows, key=lambda row: -column[row])
+
+        log.debug(f"Aggregated {len(table)} countries over {len(METRICS)} metrics")
+
+    def top(self, metric: str, n: int) -> t.List[t.Tuple[str, int]]:
+        """Get names & values of the `n` highest ranking countries in `metric`."""
+        names, column = self.table.column("name"), self.table.column(metric)
+        return [(names[row], column[row]) for row in self.rankings[metric][:n]]
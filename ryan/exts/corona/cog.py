@@ -0,0 +1,485 @@
+import asyncio
+import logging
+import sqlite3
+import typing as t
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import discord
+from discord.ext import commands
+
+from ryan.bot import Ryan
+from ryan.config import App, Emoji, Images
+from ryan.exts.corona.aggregate import Aggregates, METRICS
+from ryan.exts.corona.country import Country, CountryMap, CountryTable
+from ryan.exts.corona.feed import FeedStatus, SummaryFeed
+from ryan.exts.corona.history import HistoryStore, METRICS as HISTORY_METRICS, Snapshot
+from ryan.exts.corona.parse import ParseReport, parse_countries
+from ryan.exts.corona.state import State, build_state, make_executor
+from ryan.utils import EmbedTemplate, LRUCache, RefreshScheduler, msg_error, msg_success
+
+URL_API_HOME = "https://covid19api.com/"
+URL_API_DATA = "https://api.covid19api.com/summary"
+
+DATA_DIR = Path(App.data_dir, "corona")  # Persisted API responses & history
+
+REFRESH_INTERVAL = 60 * 60  # Seconds between periodic refreshes
+STALE_AFTER = timedelta(minutes=30)  # Data older than this is revalidated in the background when requested
+
+STREAMING_PARSE = True  # Decode API responses record by record as they arrive, rather than all at once
+
+PARSE_MODES = {"streaming": True, "buffered": False}  # Modes which can be requested in `corona refresh`
+
+BUILD_EXECUTOR = "thread"  # Where CPU-heavy state building runs: 'inline' on the event loop, 'thread' or 'process'
+
+TOP_DEFAULT, TOP_MAX = 10, 25  # Amount of countries shown in `corona top`
+COMPARE_MAX = 5  # Amount of countries which can be compared at once
+TREND_DEFAULT, TREND_MAX = 7, 365  # Amount of days looked back in `corona trend`
+
+QUERY_CACHE_SIZE = 256  # Resolved look-ups kept per map generation, including misses
+EMBED_CACHE_SIZE = 64  # Built embed templates kept per map generation
+
+_MISSING = object()  # Sentinel distinguishing a cache miss from a cached failed look-up
+
+log = logging.getLogger(__name__)
+
+
+class Corona(commands.Cog):
+    """Provide basic per-country coronavirus statistics."""
+
+    def __init__(self, bot: Ryan) -> None:
+        """Initialize attributes, then warm-start from disk & start refresh scheduler in the background."""
+        self.bot = bot
+        self.feed = SummaryFeed(URL_API_DATA, DATA_DIR)
+        self.history = HistoryStore(DATA_DIR.joinpath("history.sqlite3"))
+        self.country_map: t.Optional[CountryMap] = None  # Loaded from disk if possible, otherwise from the API
+        self.parse_report: t.Optional[ParseReport] = None  # Measurements from the last parsed response
+        self.aggregates: t.Optional[Aggregates] = None  # Figures across all countries in `country_map`
+        self.refresh_lag: t.Optional[float] = None  # Peak event loop lag during the last refresh, in seconds
+
+        # Both caches are only valid for the current `country_map` and are cleared on swap
+        self.query_cache: LRUCache[str, t.Optional[Country]] = LRUCache(maxsize=QUERY_CACHE_SIZE)
+        self.embed_cache: LRUCache[t.Tuple[Country, datetime], EmbedTemplate] = LRUCache(maxsize=EMBED_CACHE_SIZE)
+
+        self.executor = make_executor(BUILD_EXECUTOR)
+        self.scheduler = RefreshScheduler(self.refresh, interval=REFRESH_INTERVAL)
+
+        self.startup_task = bot.loop.create_task(self.startup())
+
+    def cog_unload(self) -> None:
+        """Kill startup & refresh scheduler, if running, and release the executor."""
+        self.startup_task.cancel()
+        self.scheduler.stop()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    async def cog_before_invoke(self, ctx: commands.Context) -> None:
+        """
+        Revalidate stale data in the background before any command runs.
+
+        The command itself is served from the current, possibly stale, state.
+        """
+        if (staleness := self.scheduler.staleness()) is None or staleness > STALE_AFTER:
+            self.scheduler.revalidate()
+
+    # region: API & state management
+
+    def _load_persisted(self) -> t.Optional[t.Tuple[CountryTable, datetime]]:
+        """
+        Load the persisted payload into a CountryTable, with the timestamp it was acquired at.
+
+        None if nothing is persisted, or if it fails to load or parse. This blocks on both disk
+        & CPU, see `warm_start`.
+        """
+        if (persisted := self.feed.load()) is None:
+            return None
+
+        data, timestamp = persisted
+        try:
+            table = CountryTable.from_records(data["Countries"])
+        except Exception as parse_exc:
+            log.error("Persisted payload failed to parse", exc_info=parse_exc)
+            return None
+
+        log.info("All persisted countries parsed & validated successfully")
+        return table, timestamp
+
+    async def _build_state(self, table: CountryTable, timestamp: datetime) -> State:
+        """Run `build_state` in `executor`, or directly if there is none."""
+        if self.executor is None:
+            return build_state(table, timestamp)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, build_state, table, timestamp)
+
+    def _apply(self, new_state: State) -> None:
+        """
+        Replace current state with `new_state` & invalidate everything derived from it.
+
+        All attributes are replaced without yielding to the event loop, so commands never see
+        a mix of the old & new state.
+        """
+        log.info("New state acquired, replacing old state")
+        self.country_map, self.aggregates = new_state
+
+        log.debug("Invalidating caches for previous state")
+        self.query_cache.clear()
+        self.embed_cache.clear()
+
+    async def warm_start(self) -> None:
+        """
+        Initialize state from the payload persisted by the previous run, if there is one.
+
+        Loading & parsing runs in a thread, and the state is built in `executor`, so that the event
+        loop stays responsive while the bot starts. If a refresh has already produced a state
+        meanwhile, the persisted one is discarded.
+
+        If the persisted payload fails to load, its validators are dropped, so that
+        the first refresh downloads a full payload.
+        """
+        try:
+            if (persisted := await asyncio.to_thread(self._load_persisted)) is None:
+                self.feed.forget()
+                return
+            new_state = await self._build_state(*persisted)
+        except Exception as build_exc:
+            log.error("Failed to build state from persisted payload", exc_info=build_exc)
+            self.feed.forget()
+            return
+
+        if self.country_map is not None:
+            log.info("State was refreshed during warm start, discarding persisted state")
+            return
+
+        self._apply(new_state)
+
+    async def startup(self) -> None:
+        """Warm-start, then start refresh scheduler, so that the first refresh is conditional on persisted data."""
+        await self.warm_start()
+        self.scheduler.start()
+
+    async def refresh(self, streaming: bool = STREAMING_PARSE, measure_memory: bool = False) -> bool:
+        """
+        Try to pull new data & refresh internal state.
+
+        The request is conditional on the current payload. If the server reports that
+        nothing has changed, the current state is kept without parsing anything.
+
+        The response is parsed in `streaming` mode or buffered, see `parse_countries`.
+        Peak memory during parsing is only measured with `measure_memory`, as it's costly.
+
+        CPU-heavy work is done in `executor`, so that the event loop stays responsive, and
+        the peak loop lag during the refresh is recorded to verify that.
+
+        If something goes wrong, returns False and rolls back to previous state.
+
+        This should not be called directly, but through `scheduler`, which guarantees that
+        only one refresh is ever in flight.
+        """
+        async def decode(chunks: t.AsyncIterator[bytes]) -> t.Tuple[CountryTable, ParseReport]:
+            return await parse_countries(
+                chunks, streaming=streaming, measure_memory=measure_memory, executor=self.executor
+            )
+
+        self.bot.loop_lag.reset_peak()
+
+        log.debug("Polling coronavirus API")
+        status, parsed = await self.feed.pull(self.bot.http_session, decode)
+
+        if status is FeedStatus.FAILED:
+            log.error("Failed to acquire fresh data")
+            return False
+
+        if status is FeedStatus.NOT_MODIFIED:
+            if self.country_map is not None:
+                log.info("Data not modified since last refresh, keeping current state")
+                return True
+
+            # We have validators but no state - this should never happen, but let's recover
+            log.warning("Data not modified, but there is no state, next request will be unconditional")
+            self.feed.forget()
+            return False
+
+        table, self.parse_report = parsed
+        log.info("All countries parsed & validated successfully")
+
+        timestamp = datetime.utcnow()
+        try:
+            new_state = await self._build_state(table, timestamp)
+        except Exception as build_exc:
+            log.error("Failed to build new state", exc_info=build_exc)
+            return False
+
+        self.refresh_lag = self.bot.loop_lag.peak
+
+        self.feed.commit(timestamp)
+        self._apply(new_state)
+
+        # History is a nice-to-have, failing to write it does not fail the refresh
+        try:
+            await self.history.record(new_state.country_map.table, timestamp)
+        except sqlite3.Error as db_exc:
+            log.error("Failed to record history", exc_info=db_exc)
+
+        return True
+
+    # endregion
+    # region: command interface
+
+    stats_template = EmbedTemplate(discord.Embed(colour=discord.Color.blurple()).set_thumbnail(url=Images.coronavirus))
+
+    @classmethod
+    def stats_embed(cls, name: str, icon_url: str, stats: t.Mapping[str, int], when: datetime) -> discord.Embed:
+        """Create a Discord embed representation for `stats` of a place called `name`."""
+        title = f"Currently active cases: `{stats['active']:,}` (`{stats['active_ml']:,}` per million)"
+        embed = cls.stats_template.fill(title=title, timestamp=when)
+        embed.set_author(name=name, icon_url=icon_url)
+
+        fmt = "Total: `{total:,}`\nNew: `{new:,}`\nPer-mil: `{pml:,}`"  # Types: int, int, int
+
+        embed.add_field(
+            name="Confirmed",
+            value=fmt.format(total=stats["confirmed"], new=stats["confirmed_new"], pml=stats["confirmed_ml"]),
+        )
+        embed.add_field(
+            name="Recovered",
+            value=fmt.format(total=stats["recovered"], new=stats["recovered_new"], pml=stats["recovered_ml"]),
+        )
+        embed.add_field(
+            name="Deaths",
+            value=fmt.format(total=stats["deaths"], new=stats["deaths_new"], pml=stats["deaths_ml"]),
+        )
+        return embed
+
+    @classmethod
+    def country_embed(cls, country: Country, when: datetime) -> discord.Embed:
+        """Create a Discord embed representation for `country`."""
+        stats = {metric: getattr(country, metric) for metric in METRICS}
+        return cls.stats_embed(country.name, country.flag_url(), stats, when)
+
+    def lookup(self, name: str) -> t.Optional[Country]:
+        """
+        Lookup country by `name` in the current map, going through `query_cache`.
+
+        Failed look-ups are cached as well, as users tend to repeat their typos.
+        """
+        normal_name = CountryMap.normalize(name)
+
+        if (country := self.query_cache.get(normal_name, _MISSING)) is not _MISSING:
+            log.debug(f"Query cache hit for: '{normal_name}'")
+            return country
+
+        country = self.country_map.lookup(name)
+        self.query_cache.set(normal_name, country)
+        return country
+
+    def cached_embed(self, country: Country, when: datetime) -> discord.Embed:
+        """Get `country_embed` for `country`, building it only if its template is not in `embed_cache`."""
+        if (template := self.embed_cache.get((country, when))) is None:
+            template = EmbedTemplate(self.country_embed(country, when))
+            self.embed_cache.set((country, when), template)
+
+        return template.fill()
+
+    @commands.group(name="corona", invoke_without_command=True)
+    async def cmd_group(self, ctx: commands.Context, *, name: t.Optional[str] = None) -> None:
+        """If no subcommand was invoked, try to match `name` to a country."""
+        if None in (name, self.country_map):
+            await ctx.invoke(self.cmd_status)
+            return
+
+        if (country := self.lookup(name)) is None:
+            await ctx.send(embed=msg_error(f"No such country found. {Emoji.frown}"))
+            return
+
+        await ctx.send(embed=self.cached_embed(country, self.country_map.timestamp))
+
+    @cmd_group.command(name="world", aliases=["global", "total"])
+    async def cmd_world(self, ctx: commands.Context) -> None:
+        """Show figures summed across all countries."""
+        if self.aggregates is None:
+            await ctx.invoke(self.cmd_status)
+            return
+
+        known = len(self.aggregates.rankings["active_ml"])  # Only countries with known population are ranked
+        embed = self.stats_embed("World", Images.coronavirus, self.aggregates.totals, self.country_map.timestamp)
+        embed.set_footer(text=f"Per-million figures include {known} countries with known population")
+        await ctx.send(embed=embed)
+
+    @cmd_group.command(name="top", aliases=["rank"])
+    async def cmd_top(self, ctx: commands.Context, metric: str, n: int = TOP_DEFAULT) -> None:
+        """Show the `n` countries ranking highest in `metric`."""
+        if self.aggregates is None:
+            await ctx.invoke(self.cmd_status)
+            return
+
+        if metric not in METRICS:
+            await ctx.send(embed=msg_error(f"Metric must be one of: {', '.join(f'`{m}`' for m in METRICS)}"))
+            return
+
+        n = max(1, min(n, TOP_MAX))
+        lines = (
+            f"`{position:>2}.` {name}: `{value:,}`"
+            for position, (name, value) in enumerate(self.aggregates.top(metric, n), start=1)
+        )
+        embed = discord.Embed(
+            colour=discord.Color.blurple(),
+            timestamp=self.country_map.timestamp,
+            title=f"Top {n} countries by: {METRICS[metric].lower()}",
+            description="\n".join(lines),
+        )
+        embed.set_thumbnail(url=Images.coronavirus)
+        await ctx.send(embed=embed)
+
+    @cmd_group.command(name="compare", aliases=["vs"])
+    async def cmd_compare(self, ctx: commands.Context, *names: str) -> None:
+        """
+        Show key figures for multiple countries side by side.
+
+        Country names containing spaces must be quoted.
+        """
+        if self.country_map is None:
+            await ctx.invoke(self.cmd_status)
+            return
+
+        if not 2 <= len(names) <= COMPARE_MAX:
+            await ctx.send(embed=msg_error(f"Give between 2 and {COMPARE_MAX} countries to compare"))
+            return
+
+        countries = [self.lookup(name) for name in names]
+        if missing := [name for name, country in zip(names, countries) if country is None]:
+            await ctx.send(embed=msg_error(f"No such country found: {', '.join(missing)} {Emoji.frown}"))
+            return
+
+        embed = discord.Embed(
+            colour=discord.Color.blurple(), timestamp=self.country_map.timestamp, title="Comparison",
+        )
+        embed.set_thumbnail(url=Images.coronavirus)
+        for country in countries:
+            embed.add_field(
+                name=country.name,
+                value=(
+                    f"Confirmed: `{country.confirmed:,}`\n"
+                    f"Deaths: `{country.deaths:,}`\n"
+                    f"Active: `{country.active:,}`\n"
+                    f"Active per-mil: `{country.active_ml:,}`\n"
+                    f"Deaths per-mil: `{country.deaths_ml:,}`"
+                ),
+            )
+        await ctx.send(embed=embed)
+
+    @cmd_group.command(name="trend", aliases=["history"])
+    async def cmd_trend(self, ctx: commands.Context, *, query: str) -> None:
+        """
+        Show how figures for a country changed over the last few days.
+
+        The amount of days may be given after the country name, e.g. `trend czechia 14`.
+        """
+        if self.country_map is None:
+            await ctx.invoke(self.cmd_status)
+            return
+
+        name, _, last_word = query.rpartition(" ")
+        if name and last_word.isdigit():
+            days = max(1, min(int(last_word), TREND_MAX))
+        else:
+            name, days = query, TREND_DEFAULT
+
+        if (country := self.lookup(name)) is None:
+            await ctx.send(embed=msg_error(f"No such country found. {Emoji.frown}"))
+            return
+
+        try:
+            snapshots = await self.history.trend(country.code, datetime.utcnow() - timedelta(days=days))
+        except sqlite3.Error as db_exc:
+            log.error("Failed to read history", exc_info=db_exc)
+            await ctx.send(embed=msg_error(f"Failed to read history, check log for details. {Emoji.weary}"))
+            return
+
+        if not snapshots:
+            await ctx.send(embed=msg_error(f"Not enough history recorded for {country.name} yet. {Emoji.pensive}"))
+            return
+
+        first = snapshots[0]
+        if len(snapshots) == 1:
+            # Only changes are recorded, so the figures have not changed since, compare with the current ones
+            last = Snapshot(self.country_map.timestamp, *(getattr(country, metric) for metric in HISTORY_METRICS))
+            description = f"No change recorded since {first.taken_at:%Y-%m-%d %H:%M} UTC"
+        else:
+            last = snapshots[-1]
+            description = f"Based on {len(snapshots)} snapshots since {first.taken_at:%Y-%m-%d %H:%M} UTC"
+
+        embed = discord.Embed(
+            colour=discord.Color.blurple(),
+            timestamp=last.taken_at,
+            title=f"Change over the last {days} days",
+            description=description,
+        )
+        embed.set_thumbnail(url=Images.coronavirus)
+        embed.set_author(name=country.name, icon_url=country.flag_url())
+
+        for metric in ("confirmed", "recovered", "deaths", "active"):
+            now, then = getattr(last, metric), getattr(first, metric)
+            embed.add_field(name=METRICS[metric], value=f"Now: `{now:,}`\nChange: `{now - then:+,}`")
+
+        await ctx.send(embed=embed)
+
+    @cmd_group.command(name="status", aliases=["info", "about"])
+    async def cmd_status(self, ctx: commands.Context) -> None:
+        """Show info about internal state."""
+        if self.country_map is not None:
+            embed = msg_success(
+                f"There are currently `{len(self.country_map)}` countries in the cache.\n"
+                f"Query cache: `{self.query_cache.hits}` hits, `{self.query_cache.misses}` misses "
+                f"(`{self.query_cache.ratio():.0%}`)\n"
+                f"Embed cache: `{self.embed_cache.hits}` hits, `{self.embed_cache.misses}` misses "
+                f"(`{self.embed_cache.ratio():.0%}`)"
+            )
+            if self.parse_report is not None:
+                embed.add_field(name="Last parse", value=self.parse_report.describe())
+        else:
+            embed = msg_error("Cache is empty, check log for errors.")
+
+        embed.add_field(name="Refresh", value=self.scheduler.describe(), inline=False)
+
+        lag = f"`{self.refresh_lag * 1000:,.1f} ms`" if self.refresh_lag is not None else "n/a"
+        embed.add_field(
+            name="Event loop lag",
+            value=f"{self.bot.loop_lag.describe()}\nPeak during last refresh: {lag} (built: `{BUILD_EXECUTOR}`)",
+            inline=False,
+        )
+
+        await ctx.send(embed=embed)
+
+    @cmd_group.command(name="refresh", aliases=["pull"])
+    async def cmd_refresh(self, ctx: commands.Context, mode: t.Optional[str] = None) -> None:
+        """
+        Refresh internal state.
+
+        If parse `mode` is given, a full response is requested regardless of whether data has
+        changed, and it is parsed in that mode with memory measurement enabled. The response
+        then includes the parse report, which is useful to compare the modes.
+        """
+        if mode is not None and mode not in PARSE_MODES:
+            await ctx.send(embed=msg_error(f"Parse mode must be one of: {', '.join(PARSE_MODES)}"))
+            return
+
+        log.debug(f"Manually refreshing internal state (mode: {mode})")
+        if mode is not None:
+            async def full_refresh() -> bool:
+                self.feed.forget()
+                return await self.refresh(streaming=PARSE_MODES[mode], measure_memory=True)
+
+            refreshed = await self.scheduler.trigger(full_refresh)
+        else:
+            refreshed = await self.scheduler.trigger()
+
+        if refreshed:
+            resp = msg_success(f"Refreshed successfully! {Emoji.ok_hand}")
+            if mode is not None and self.parse_report is not None:
+                resp.add_field(name="Parse report", value=self.parse_report.describe())
+        else:
+            resp = msg_error(f"Something has gone wrong, check log for details. {Emoji.weary}")
+
+        await ctx.send(embed=resp)
+
+    # endregion
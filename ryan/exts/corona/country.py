@@ -0,0 +1,261 @@
+import logging
+import typing as t
+from array import array
+from datetime import datetime
+
+from ryan.exts.corona.lookup import LookupIndex, normalize
+from ryan.exts.corona.reference import get_alpha_3, get_population
+
+URL_FLAGS = "https://www.countryflags.io/{code}/flat/64.png"
+
+Record = t.Dict[str, t.Any]  # A single country record returned from the API
+
+log = logging.getLogger(__name__)
+
+
+class _Column:
+    """
+    Descriptor exposing one column of a `CountryTable` as a `Country` attribute.
+
+    The attribute name is the column name.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: t.Optional["Country"], owner: type) -> t.Any:
+        if instance is None:
+            return self
+        return instance.table.columns[self.name][instance.row]
+
+
+class Country:
+    """
+    Protocol for accessing API-provided data for a single country.
+
+    An instance is merely a view of one row in a `CountryTable`, which holds the actual data.
+    The attributes read through to the table's columns, so creating an instance is cheap,
+    and two instances are equal if they view the same row of the same table.
+    """
+
+    __slots__ = ("table", "row")
+
+    name = _Column()  # Regular name form
+    slug = _Column()  # Standardized name form (API specific, most likely)
+    code = _Column()  # Alpha-2 ISO country code
+
+    confirmed = _Column()
+    confirmed_new = _Column()
+    recovered = _Column()
+    recovered_new = _Column()
+    deaths = _Column()
+    deaths_new = _Column()
+    active = _Column()
+    population = _Column()  # Zero if unknown
+
+    confirmed_ml = _Column()
+    recovered_ml = _Column()
+    deaths_ml = _Column()
+    active_ml = _Column()
+
+    def __init__(self, table: "CountryTable", row: int) -> None:
+        """Construct a view of `row` in `table`."""
+        self.table = table
+        self.row = row
+
+    def __eq__(self, other: t.Any) -> bool:
+        """Views are equal if they point at the same row of the same table."""
+        if not isinstance(other, Country):
+            return NotImplemented
+        return self.table is other.table and self.row == other.row
+
+    def __hash__(self) -> int:
+        """Hash consistently with `__eq__`."""
+        return hash((id(self.table), self.row))
+
+    def __repr__(self) -> str:
+        """Show name & row."""
+        return f"<Country name={self.name!r} row={self.row}>"
+
+    def flag_url(self) -> str:
+        """Inject own `code` into the flag url template."""
+        return URL_FLAGS.format(code=self.code)
+
+
+class CountryTable:
+    """
+    Columnar storage for API-provided data of all countries.
+
+    Numeric columns are kept in typed arrays indexed by row, so a country costs a few machine
+    words per column rather than a full object, and aggregate queries can run over whole
+    columns rather than over `Country` instances.
+
+    Rows are appended from `Record` instances. This primarily serves to validate the input
+    data and to compute a few extra properties on top. Once a row is appended, its values
+    become safer to work with.
+
+    Per-million columns are derived from whole columns in a single pass once all rows are
+    appended, see `seal`. No rows can be appended after that.
+    """
+
+    STR_COLUMNS = ("name", "slug", "code")
+    INT_COLUMNS = (
+        "confirmed", "confirmed_new", "recovered", "recovered_new", "deaths", "deaths_new", "active", "population",
+    )
+    DERIVED_COLUMNS = {  # Per-million columns & the columns they derive from
+        "confirmed_ml": "confirmed",
+        "recovered_ml": "recovered",
+        "deaths_ml": "deaths",
+        "active_ml": "active",
+    }
+
+    def __init__(self) -> None:
+        """Prepare empty columns."""
+        self.columns: t.Dict[str, t.MutableSequence] = {name: [] for name in self.STR_COLUMNS}
+        self.columns.update({name: array("q") for name in (*self.INT_COLUMNS, *self.DERIVED_COLUMNS)})
+        self.sealed = False
+
+    def __len__(self) -> int:
+        """Amount of rows in the table."""
+        return len(self.columns["name"])
+
+    def __getitem__(self, row: int) -> Country:
+        """Get view of `row`."""
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row {row} out of range")
+        return Country(self, row)
+
+    def __iter__(self) -> t.Iterator[Country]:
+        """Iterate views of all rows in order."""
+        return (Country(self, row) for row in range(len(self)))
+
+    def column(self, name: str) -> t.Sequence:
+        """Get column `name`, this must not be mutated."""
+        return self.columns[name]
+
+    def total(self, name: str) -> int:
+        """Sum of int column `name` over all rows."""
+        return sum(self.columns[name])
+
+    def append(self, record: Record) -> Country:
+        """
+        Validate `record` & append it as a new row, returning its view.
+
+        This is entirely naive and will fail on API changes. All values are computed before
+        any column is touched, so a record which fails to validate leaves the table intact.
+
+        The view must not be read before the table is sealed, as derived columns don't exist yet.
+        """
+        if self.sealed:
+            raise RuntimeError("Cannot append to a sealed table")
+
+        name = str(record["Country"])
+        slug = str(record["Slug"])
+        code = str(record["CountryCode"])
+
+        confirmed = int(record["TotalConfirmed"])
+        confirmed_new = int(record["NewConfirmed"])
+
+        recovered = int(record["TotalRecovered"])
+        recovered_new = int(record["NewRecovered"])
+
+        deaths = int(record["TotalDeaths"])
+        deaths_new = int(record["NewDeaths"])
+
+        # Active cases are not given by the API but can be somewhat accurately computed,
+        # for most countries this corresponds to the reported number so I'm fine with it
+        active = confirmed - (recovered + deaths)
+
+        # Population is static, so we only look it up here, per-million stats are derived in `seal`
+        population = get_population(code)
+
+        values = (
+            name, slug, code,
+            confirmed, confirmed_new, recovered, recovered_new, deaths, deaths_new, active, population,
+        )
+        for column_name, value in zip(self.STR_COLUMNS + self.INT_COLUMNS, values):
+            self.columns[column_name].append(value)
+
+        return Country(self, len(self) - 1)
+
+    def seal(self) -> None:
+        """
+        Compute derived per-million columns in one pass over whole columns & disallow appending.
+
+        If population for a country is unknown, its per-million stats default to -1, so that they
+        can be int-formatted. Sealing an already sealed table does nothing.
+        """
+        if self.sealed:
+            return
+
+        population = self.columns["population"]
+        mils = [pop / 1_000_000 for pop in population]
+
+        for derived, source in self.DERIVED_COLUMNS.items():
+            self.columns[derived] = array(
+                "q", [int(value / mil) if mil else -1 for value, mil in zip(self.columns[source], mils)]
+            )
+
+        if missing := [code for code, pop in zip(self.columns["code"], population) if not pop]:
+            log.error(f"Failed to fetch population for: {', '.join(missing)}")
+
+        self.sealed = True
+
+    @classmethod
+    def from_records(cls, records: t.Iterable[Record]) -> "CountryTable":
+        """Build table from all `records` at once."""
+        table = cls()
+        for record in records:
+            table.append(record)
+        table.seal()
+        return table
+
+
+class CountryMap:
+    """Wrap a Country map & provide convenience methods for look-ups."""
+
+    normalize = staticmethod(normalize)
+
+    @staticmethod
+    def aliases(country: Country) -> t.Iterator[str]:
+        """Yield normalized alternative names for `country`: ISO codes & the API slug."""
+        yield normalize(country.code)
+        if (alpha_3 := get_alpha_3(country.code)) is not None:
+            yield normalize(alpha_3)
+        yield normalize(country.slug)
+
+    def __init__(self, table: CountryTable, timestamp: t.Optional[datetime] = None) -> None:
+        """
+        Initiate internal mapper for `table` acquired at `timestamp`, or now if not given.
+
+        The look-up index is built here, exactly once per map, so that all queries
+        against this generation of data are cheap.
+        """
+        self.table = table
+        self.table.seal()
+
+        # The index maps to rows, views are only created for countries which are looked up
+        self.index: LookupIndex[int] = LookupIndex(
+            items=((self.normalize(country.name), country.row) for country in table),
+            aliases=((alias, country.row) for country in table for alias in self.aliases(country)),
+        )
+        self.timestamp = timestamp or datetime.utcnow()
+
+    def __len__(self) -> int:
+        """Amount of countries in the map."""
+        return len(self.index)
+
+    def lookup(self, name: str) -> t.Optional[Country]:
+        """
+        Lookup country by `name`.
+
+        First, `name` is normalized and checked for membership in the map, or among
+        the ISO codes & slugs. If found, the result is returned directly. Otherwise,
+        we attempt to find a substring or close match in the map's keys. If this fails
+        as well, None is returned.
+        """
+        normal_name = self.normalize(name)
+        log.debug(f"Name '{name}' normalized into '{normal_name}'")
+
+        if (row := self.index.lookup(normal_name)) is not None:
+            return self.table[row]
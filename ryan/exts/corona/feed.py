@@ -0,0 +1,234 @@
+import asyncio
+import enum
+import json
+import logging
+import typing as t
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+T = t.TypeVar("T")
+
+Payload = t.Dict[str, t.Any]  # Full decoded response body
+Decoder = t.Callable[[t.AsyncIterator[bytes]], t.Awaitable[T]]  # Consumes body chunks into a result
+
+CHUNK_SIZE = 64 * 1024  # Bytes read from the response at once
+
+
+class FeedStatus(enum.Enum):
+    """Flags signaling outcome when pulling the feed."""
+
+    FRESH = 0  # New payload was received
+    NOT_MODIFIED = 1  # Server confirmed that our last payload is still current
+    FAILED = 2  # Request failed, or the payload did not decode
+
+
+class SummaryFeed:
+    """
+    Conditional HTTP client for a JSON resource, backed by an on-disk copy of the last good payload.
+
+    After a payload is committed, its `ETag` and `Last-Modified` validators are sent along with
+    the next request, allowing the server to answer with 304 and skip the body entirely.
+
+    The raw body is persisted in `directory` next to a small metadata file holding the validators,
+    so that a restarted bot can both serve the stored data immediately & keep making conditional
+    requests against it. The body is written to disk as it streams in, in a thread, it is never
+    buffered by the feed itself.
+    """
+
+    def __init__(self, url: str, directory: Path) -> None:
+        """Prepare feed for `url` persisting into `directory`, nothing is loaded yet."""
+        self.url = url
+
+        self.body_file = directory.joinpath("summary.json")
+        self.part_file = directory.joinpath("summary.json.part")  # Body being received
+        self.meta_file = directory.joinpath("summary.meta.json")
+
+        # Validators of the last committed payload, these are sent with requests
+        self.etag: t.Optional[str] = None
+        self.last_modified: t.Optional[str] = None
+
+        # Validators of the last received payload, waiting to be committed, and whether
+        # its body was fully written into `part_file`
+        self._pending: t.Optional[t.Tuple[t.Optional[str], t.Optional[str], bool]] = None
+
+    def headers(self) -> t.Dict[str, str]:
+        """Build conditional request headers from current validators."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    async def pull(self, session: aiohttp.ClientSession, decode: Decoder) -> t.Tuple[FeedStatus, t.Optional[T]]:
+        """
+        Make a conditional request for the resource & pass the body chunks to `decode`.
+
+        The result of `decode` is only given with `FeedStatus.FRESH`. If `decode` raises, the pull
+        is considered failed. Once the caller validates the result, it should call `commit` - until
+        then, validators are not updated, and the next request will be conditional on the previous
+        payload.
+        """
+        headers = self.headers()
+        log.debug(f"Polling feed with conditional headers: {headers}")
+        try:
+            async with session.get(self.url, headers=headers) as resp:
+                log.debug(f"Response status: {resp.status}")
+
+                if resp.status == 304:
+                    return FeedStatus.NOT_MODIFIED, None
+
+                resp.raise_for_status()
+                etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+                part = await asyncio.to_thread(self._open_part)
+                try:
+                    result = await decode(self._tee(resp.content.iter_chunked(CHUNK_SIZE), part))
+                finally:
+                    if part is not None:
+                        await part.close()
+
+        except aiohttp.ClientError as err:
+            log.exception("Failed to acquire data from API", exc_info=err)
+            return FeedStatus.FAILED, None
+
+        except Exception as decode_exc:
+            log.error("Response body failed to decode", exc_info=decode_exc)
+            return FeedStatus.FAILED, None
+
+        self._pending = etag, last_modified, part is not None and not part.failed
+        return FeedStatus.FRESH, result
+
+    def commit(self, timestamp: datetime) -> None:
+        """
+        Accept the last pulled payload, acquired at `timestamp`.
+
+        Validators are updated & the received body replaces the persisted one. Failing to write
+        to disk is logged, but otherwise ignored, the feed keeps working in-memory.
+        """
+        if self._pending is None:
+            log.warning("Nothing to commit")
+            return
+
+        self.etag, self.last_modified, written = self._pending
+        self._pending = None
+
+        if not written:
+            log.warning("Payload was not written to disk, it will not be persisted")
+            return
+
+        meta = {"etag": self.etag, "last_modified": self.last_modified, "timestamp": timestamp.isoformat()}
+
+        log.debug(f"Persisting payload into: {self.body_file}")
+        try:
+            self.part_file.replace(self.body_file)
+            self._write_atomic(self.meta_file, json.dumps(meta).encode("UTF-8"))
+        except OSError as os_exc:
+            log.error("Failed to persist payload", exc_info=os_exc)
+
+    def load(self) -> t.Optional[t.Tuple[Payload, datetime]]:
+        """
+        Load the persisted payload & its acquisition timestamp, and adopt its validators.
+
+        None if nothing is persisted, or if the files fail to load.
+        """
+        if not (self.body_file.exists() and self.meta_file.exists()):
+            log.debug("No persisted payload found")
+            return None
+
+        try:
+            meta = json.loads(self.meta_file.read_bytes())
+            payload = json.loads(self.body_file.read_bytes())
+            timestamp = datetime.fromisoformat(meta["timestamp"])
+        except (OSError, ValueError, KeyError) as load_exc:
+            log.error("Failed to load persisted payload", exc_info=load_exc)
+            return None
+
+        self.etag, self.last_modified = meta.get("etag"), meta.get("last_modified")
+        log.info(f"Loaded persisted payload from: {timestamp}")
+        return payload, timestamp
+
+    def forget(self) -> None:
+        """Drop validators, forcing the next pull to be unconditional."""
+        self.etag = self.last_modified = None
+
+    def _open_part(self) -> t.Optional["_PartFile"]:
+        """Open `part_file` for writing, None if that is not possible."""
+        try:
+            self.part_file.parent.mkdir(parents=True, exist_ok=True)
+            return _PartFile(self.part_file.open(mode="wb"))
+        except OSError as os_exc:
+            log.error("Cannot write payload to disk", exc_info=os_exc)
+
+    @staticmethod
+    async def _tee(chunks: t.AsyncIterator[bytes], part: t.Optional["_PartFile"]) -> t.AsyncIterator[bytes]:
+        """Pass `chunks` through, writing each into `part` on the way."""
+        async for chunk in chunks:
+            if part is not None:
+                await part.write(chunk)
+            yield chunk
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write `data` into `path` via a temporary file, so that a crash never leaves a partial file."""
+        temp = path.with_suffix(path.suffix + ".tmp")
+        temp.write_bytes(data)
+        temp.replace(path)
+
+
+class _PartFile:
+    """
+    Wrap a file being written while a body streams in.
+
+    Writes run in a thread, so that the disk never blocks the event loop. Each write is only
+    awaited before the next one starts, so it overlaps with receiving the next chunk, while
+    chunks are still written one at a time & in order.
+
+    Write errors are logged once and further writes are skipped, a full disk should
+    not fail the request - it only means the payload will not be persisted.
+    """
+
+    def __init__(self, file: t.BinaryIO) -> None:
+        self.file = file
+        self.failed = False
+        self._writing: t.Optional[asyncio.Task] = None  # Write in flight
+
+    def _write(self, chunk: bytes) -> None:
+        """Write `chunk`, unless a previous write has failed."""
+        if self.failed:
+            return
+        try:
+            self.file.write(chunk)
+        except OSError as os_exc:
+            log.error("Failed to write payload chunk, giving up on persisting it", exc_info=os_exc)
+            self.failed = True
+
+    async def _wait(self) -> None:
+        """Wait for the write in flight, if any."""
+        if self._writing is not None:
+            await self._writing
+            self._writing = None
+
+    async def write(self, chunk: bytes) -> None:
+        """Wait for the previous write & start writing `chunk` in the background."""
+        await self._wait()
+        self._writing = asyncio.create_task(asyncio.to_thread(self._write, chunk))
+
+    def _close(self) -> None:
+        """Close the underlying file."""
+        try:
+            self.file.close()
+        except OSError as os_exc:
+            log.error("Failed to close payload file", exc_info=os_exc)
+            self.failed = True
+
+    async def close(self) -> None:
+        """Wait for the write in flight & close the underlying file."""
+        try:
+            await self._wait()
+        finally:
+            await asyncio.to_thread(self._close)
@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ryan.exts.corona.country import CountryTable
+
+log = logging.getLogger(__name__)
+
+METRICS = ("confirmed", "recovered", "deaths", "active")  # Columns kept in history
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    code TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    {", ".join(f"{metric} INTEGER NOT NULL" for metric in METRICS)},
+    PRIMARY KEY (code, taken_at)
+) WITHOUT ROWID
+"""
+
+Values = t.Tuple[int, ...]  # Values of `METRICS` in order
+
+
+class Snapshot(t.NamedTuple):
+    """State of a single country at a point in time."""
+
+    taken_at: datetime
+    confirmed: int
+    recovered: int
+    deaths: int
+    active: int
+
+
+def _epoch(when: datetime) -> int:
+    """Convert naive UTC `when` to Unix seconds."""
+    return int(when.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _from_epoch(seconds: int) -> datetime:
+    """Convert Unix `seconds` to naive UTC datetime."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+class HistoryStore:
+    """
+    Append-only SQLite store of per-country snapshots.
+
+    A row is only written for a country if its values differ from its latest stored row,
+    so refreshes which bring no new figures cost nothing. A country's value at any point
+    in time is therefore given by its latest row at or before that point.
+
+    Rows are keyed by (code, taken_at), which is also the clustered index of the table,
+    so range queries for one country never touch rows of other countries.
+
+    All database work is done in a worker thread, with a short-lived connection per operation.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Prepare store at `path`, the schema is created on first use."""
+        self.path = path
+        self._latest: t.Optional[t.Dict[str, Values]] = None  # Latest stored values per code, lazily loaded
+        self._lock = asyncio.Lock()  # Serializes writers, so that `_latest` stays consistent
+
+    @contextlib.contextmanager
+    def _connect(self) -> t.Iterator[sqlite3.Connection]:
+        """Open connection & ensure schema exists, commit on success & close on exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                connection.execute(SCHEMA)
+                yield connection
+        finally:
+            connection.close()
+
+    def _load_latest(self, connection: sqlite3.Connection) -> t.Dict[str, Values]:
+        """Read latest stored values of every country."""
+        rows = connection.execute(
+            f"SELECT code, {', '.join(METRICS)} FROM snapshots AS s "
+            f"WHERE taken_at = (SELECT MAX(taken_at) FROM snapshots WHERE code = s.code)"
+        )
+        return {code: tuple(values) for code, *values in rows}
+
+    def _write(self, rows: t.List[t.Tuple[str, Values]], taken_at: int) -> int:
+        """Insert `rows` which differ from the latest stored values, return amount inserted."""
+        with self._connect() as connection:
+            if self._latest is None:
+                self._latest = self._load_latest(connection)
+
+            changed = [(code, values) for code, values in rows if self._latest.get(code) != values]
+            connection.executemany(
+                f"INSERT OR REPLACE INTO snapshots VALUES (?, ?, {', '.join('?' for _ in METRICS)})",
+                [(code, taken_at, *values) for code, values in changed],
+            )
+
+        self._latest.update(changed)
+        return len(changed)
+
+    async def record(self, table: CountryTable, taken_at: datetime) -> int:
+        """Store state of all countries in `table` at `taken_at`, return amount of rows written."""
+        columns = [table.column("code")] + [table.column(metric) for metric in METRICS]
+        rows = [(code, tuple(values)) for code, *values in zip(*columns)]
+
+        async with self._lock:
+            written = await asyncio.to_thread(self._write, rows, _epoch(taken_at))
+
+        log.info(f"Recorded {written} changed countries out of {len(rows)} into history")
+        return written
+
+    def _read(self, code: str, since: int) -> t.List[Snapshot]:
+        """Read rows of `code` from `since`, preceded by the latest row before `since`."""
+        with self._connect() as connection:
+            columns = ", ".join(("taken_at", *METRICS))
+            before = connection.execute(
+                f"SELECT {columns} FROM snapshots WHERE code = ? AND taken_at < ? ORDER BY taken_at DESC LIMIT 1",
+                (code, since),
+            ).fetchall()
+            within = connection.execute(
+                f"SELECT {columns} FROM snapshots WHERE code = ? AND taken_at >= ? ORDER BY taken_at",
+                (code, since),
+            ).fetchall()
+
+        return [Snapshot(_from_epoch(taken_at), *values) for taken_at, *values in before + within]
+
+    async def trend(self, code: str, since: datetime) -> t.List[Snapshot]:
+        """
+        Get snapshots of country `code` describing its state from `since` onwards, oldest first.
+
+        The first snapshot may be older than `since`, as it gives the state at `since`.
+        """
+        return await asyncio.to_thread(self._read, code, _epoch(since))
@@ -0,0 +1,188 @@
+import difflib
+import logging
+import typing as t
+from collections import Counter, defaultdict
+
+log = logging.getLogger(__name__)
+
+T = t.TypeVar("T")
+
+GRAM_SIZE = 3  # Length of n-grams used for the substring index
+SUBSTRING_MIN = 5  # Queries shorter than this do not attempt substring matching, too many false positives
+FUZZY_CUTOFF = 0.75  # Minimum `SequenceMatcher.ratio` for a fuzzy match to be accepted
+
+
+def normalize(name: str) -> str:
+    """Normalize country `name` for look-up."""
+    return name.lower().replace(" ", "")
+
+
+def ngrams(text: str) -> t.Set[str]:
+    """Produce the set of all `GRAM_SIZE` long substrings of `text`."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class LookupIndex(t.Generic[T]):
+    """
+    Precomputed look-up structures over a fixed set of normalized keys.
+
+    The index answers the same questions, with the same answers, as the naive approach
+    of a dict hit, followed by a linear substring scan, followed by `difflib` over all keys.
+    The difference is that all per-key work is done once at construction, so that
+    a query only ever touches the few keys that can possibly match it.
+
+    Keys are given an id by their insertion order, which is what the naive substring
+    scan would use to break ties. Aliases (e.g. ISO codes) only ever match exactly.
+    """
+
+    def __init__(self, items: t.Iterable[t.Tuple[str, T]], aliases: t.Iterable[t.Tuple[str, T]] = ()) -> None:
+        """
+        Build the index from normalized `items` and `aliases`.
+
+        On duplicate keys, the first occurrence wins for the substring scan, but the value
+        is overwritten, mirroring what a dict comprehension over the same pairs would do.
+        """
+        self.exact: t.Dict[str, T] = {}
+        for key, value in items:
+            self.exact[key] = value
+
+        self.keys: t.List[str] = list(self.exact)
+
+        # Aliases never shadow a proper key, since a name is a stronger signal than a code
+        self.aliases: t.Dict[str, T] = {}
+        for alias, value in aliases:
+            if alias not in self.exact:
+                self.aliases.setdefault(alias, value)
+
+        # Inverted index from each n-gram to ascending ids of keys containing it
+        self.grams: t.Dict[str, t.List[int]] = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram in ngrams(key):
+                self.grams[gram].append(key_id)
+
+        # Keys bucketed by length, used to bound fuzzy similarity
+        self.lengths: t.Dict[int, t.List[int]] = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            self.lengths[len(key)].append(key_id)
+
+        # Character multisets are encoded as bitmasks, one bit per occurrence of each character,
+        # so that the size of an intersection is the popcount of a bitwise and
+        self.alphabet: t.Dict[str, int] = {}
+        self.repeats = 1
+        for key in self.keys:
+            for char, count in Counter(key).items():
+                self.alphabet.setdefault(char, len(self.alphabet))
+                self.repeats = max(self.repeats, count)
+
+        self.masks: t.List[int] = [self.charmask(key) for key in self.keys]
+
+        log.debug(f"Indexed {len(self.keys)} keys, {len(self.aliases)} aliases & {len(self.grams)} n-grams")
+
+    def __len__(self) -> int:
+        """Amount of proper keys in the index."""
+        return len(self.keys)
+
+    def charmask(self, text: str) -> int:
+        """
+        Encode the character multiset of `text` as a bitmask.
+
+        Characters outside of the alphabet can never be matched, so they are skipped. Counts
+        are clipped to `repeats`, which does not change the size of any intersection with a key.
+        """
+        mask = 0
+        for char, count in Counter(text).items():
+            if (char_id := self.alphabet.get(char)) is not None:
+                mask |= ((1 << min(count, self.repeats)) - 1) << (char_id * self.repeats)
+        return mask
+
+    def exact_match(self, query: str) -> t.Optional[T]:
+        """Get value for `query` if it is a key, or an alias, in that order."""
+        if (value := self.exact.get(query)) is not None:
+            return value
+        return self.aliases.get(query)
+
+    def substring_match(self, query: str) -> t.Optional[T]:
+        """
+        If `query` is a substring of any key, return its value.
+
+        For `query` shorter than `SUBSTRING_MIN` characters, the search is aborted, as it
+        would produce too many false positives. If there are multiple matches, the first
+        inserted one is given.
+
+        Any key containing `query` must also contain all of its n-grams, so we only verify
+        keys present in the intersection of the n-gram postings.
+        """
+        if len(query) < SUBSTRING_MIN:
+            return None
+
+        postings = []
+        for gram in ngrams(query):
+            if (posting := self.grams.get(gram)) is None:
+                return None
+            postings.append(posting)
+
+        # Intersect starting from the rarest n-gram, the candidates only ever shrink
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        for key_id in sorted(candidates):
+            if query in (key := self.keys[key_id]):
+                return self.exact[key]
+
+    def fuzzy_match(self, query: str) -> t.Optional[T]:
+        """
+        Find the key most similar to `query`, if any scores at least `FUZZY_CUTOFF`.
+
+        This gives the same answer as `difflib.get_close_matches` with n=1, but skips keys
+        whose similarity is bounded under the cutoff. For a ratio of 2 * M / (a + b), where
+        M is the amount of matching characters, the length bound follows from M <= min(a, b)
+        and the character bound from M <= size of the character multiset intersection.
+        """
+        if not query:
+            return None
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)  # Seq2 details are cached, so the query goes here
+
+        query_len = len(query)
+        query_mask = self.charmask(query)
+
+        best: t.Optional[t.Tuple[float, str]] = None
+
+        for key_len, key_ids in self.lengths.items():
+            total = query_len + key_len
+            if 2 * min(query_len, key_len) / total < FUZZY_CUTOFF:
+                continue
+
+            for key_id in key_ids:
+                common = bin(self.masks[key_id] & query_mask).count("1")
+                if 2 * common / total < FUZZY_CUTOFF:
+                    continue
+
+                key = self.keys[key_id]
+                matcher.set_seq1(key)
+                if (score := matcher.ratio()) >= FUZZY_CUTOFF and (best is None or (score, key) > best):
+                    best = score, key
+
+        if best is not None:
+            return self.exact[best[1]]
+
+    def lookup(self, query: str) -> t.Optional[T]:
+        """
+        Find value for normalized `query`.
+
+        Tries an exact match, then a substring match, then a fuzzy match. None if all fail.
+        """
+        if (value := self.exact_match(query)) is not None:
+            log.debug("Query found directly in index")
+            return value
+
+        if (value := self.substring_match(query)) is not None:
+            log.debug("Found a substring match")
+            return value
+
+        log.debug("Query does not exist in index, trying to find closest match")
+        if (value := self.fuzzy_match(query)) is None:
+            log.debug("No match found")
+
+        return value
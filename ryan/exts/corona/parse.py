@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import tracemalloc
+import typing as t
+from concurrent.futures import Executor
+
+from ryan.exts.corona.country import CountryTable
+from ryan.exts.corona.stream import StreamDecoder
+
+log = logging.getLogger(__name__)
+
+YIELD_EVERY = 50  # Records appended between yielding control back to the event loop
+
+Chunks = t.AsyncIterator[bytes]
+
+
+class ParseReport(t.NamedTuple):
+    """Measurements taken while parsing a single response."""
+
+    mode: str  # Either 'streaming' or 'buffered'
+    records: int  # Amount of appended records
+    duration: float  # Seconds from first to last chunk, includes waiting on the network
+    busy: float  # Seconds spent blocking the event loop
+    longest_block: float  # Longest single stretch of blocking the event loop, in seconds
+    peak_memory: t.Optional[int]  # Peak of traced allocations in bytes, if measured
+
+    def describe(self) -> str:
+        """Format report for humans."""
+        memory = f"{self.peak_memory / 1024:,.0f} KiB" if self.peak_memory is not None else "not measured"
+        return (
+            f"Mode: `{self.mode}` ({self.records} records)\n"
+            f"Duration: `{self.duration * 1000:,.1f} ms`, busy: `{self.busy * 1000:,.1f} ms`, "
+            f"longest block: `{self.longest_block * 1000:,.1f} ms`\n"
+            f"Peak memory: `{memory}`"
+        )
+
+
+class _Meter:
+    """Accumulate time spent in blocking sections & optionally trace peak memory."""
+
+    def __init__(self, measure_memory: bool) -> None:
+        self.measure_memory = measure_memory
+        self.busy = 0.0
+        self.longest_block = 0.0
+        self.peak_memory: t.Optional[int] = None
+
+    @contextlib.contextmanager
+    def block(self) -> t.Iterator[None]:
+        """Measure a section which does not yield to the event loop."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.busy += elapsed
+            self.longest_block = max(self.longest_block, elapsed)
+
+    @contextlib.contextmanager
+    def trace(self) -> t.Iterator[None]:
+        """
+        Trace peak memory across the whole section, if enabled.
+
+        Tracing is process-wide and slows allocations down considerably, so it is only
+        enabled on demand. If something else already started tracing, we leave it running.
+        """
+        if not self.measure_memory:
+            yield
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_memory = peak - baseline
+            if started:
+                tracemalloc.stop()
+
+
+def _decode_table(body: bytes) -> CountryTable:
+    """Decode whole `body` & build a table from it, this is safe to run in any thread or process."""
+    data = json.loads(body)
+    return CountryTable.from_records(data["Countries"])
+
+
+async def _parse_buffered(chunks: Chunks, meter: _Meter, executor: t.Optional[Executor]) -> CountryTable:
+    """
+    Read the whole body, decode it at once, and append all records in one go.
+
+    If `executor` is given, the decoding runs there and the event loop is not blocked at all.
+    """
+    body = b"".join([chunk async for chunk in chunks])
+
+    if executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(executor, _decode_table, body)
+
+    with meter.block():
+        return _decode_table(body)
+
+
+async def _parse_streaming(chunks: Chunks, meter: _Meter, executor: t.Optional[Executor]) -> CountryTable:
+    """
+    Decode records as chunks arrive and append them in small batches.
+
+    Control is given back to the event loop both while waiting for chunks and between batches.
+    The work is already split into short blocks, so `executor` is not used.
+    """
+    decoder = StreamDecoder(key="Countries")
+    table = CountryTable()
+
+    async def construct(records: t.List[t.Any]) -> None:
+        for start in range(0, len(records), YIELD_EVERY):
+            with meter.block():
+                for record in records[start:start + YIELD_EVERY]:
+                    table.append(record)
+            await asyncio.sleep(0)
+
+    async for chunk in chunks:
+        with meter.block():
+            records = decoder.feed(chunk)
+        await construct(records)
+
+    with meter.block():
+        records = decoder.close()
+    await construct(records)
+
+    with meter.block():
+        table.seal()
+
+    return table
+
+
+async def parse_countries(
+    chunks: Chunks, streaming: bool, measure_memory: bool = False, executor: t.Optional[Executor] = None
+) -> t.Tuple[CountryTable, ParseReport]:
+    """
+    Parse `chunks` of the API response body into a CountryTable.
+
+    With `streaming`, the body is decoded record by record as it arrives. Otherwise it is
+    buffered & decoded whole, in `executor` if given. Errors propagate to the caller.
+
+    Memory tracing only covers the current process, work done in a process pool is not measured.
+    """
+    mode = "streaming" if streaming else "buffered"
+    parse = _parse_streaming if streaming else _parse_buffered
+
+    meter = _Meter(measure_memory)
+    start = time.perf_counter()
+
+    with meter.trace():
+        table = await parse(chunks, meter, executor)
+
+    report = ParseReport(
+        mode=mode,
+        records=len(table),
+        duration=time.perf_counter() - start,
+        busy=meter.busy,
+        longest_block=meter.longest_block,
+        peak_memory=meter.peak_memory,
+    )
+    log.info(f"Parsed {report.records} records ({mode}) in {report.duration:.3f}s, busy {report.busy:.3f}s")
+    return table, report
@@ -0,0 +1,61 @@
+import json
+import logging
+import typing as t
+from array import array
+from importlib import resources
+
+log = logging.getLogger(__name__)
+
+# The population package ships with a static table of ISO codes & populations, which we
+# load directly, so that the whole table is held in a compact form and the Alpha-3 codes
+# are also available, since the API only gives us the Alpha-2 form
+DATAFILE = resources.files("pypopulation") / "resources" / "countries.json"
+
+CodeMap = t.Dict[str, str]  # From Alpha-2 code to Alpha-3 code
+SlotMap = t.Dict[str, int]  # From both Alpha-2 & Alpha-3 codes to a slot in the population array
+
+
+def _load_file() -> t.List[t.Dict[str, t.Any]]:
+    """Load `DATAFILE` into a Python list object."""
+    log.debug(f"Loading reference data from: {DATAFILE}")
+    with DATAFILE.open(mode="r", encoding="UTF-8") as datafile:
+        return json.load(datafile)
+
+
+def _initialize() -> t.Tuple[CodeMap, SlotMap, array]:
+    """Init Alpha-2 to Alpha-3 map, and the population array with its slot map, from `DATAFILE`."""
+    a3_map: CodeMap = {}
+    slot_map: SlotMap = {}
+    population = array("q")
+
+    for slot, country in enumerate(_load_file()):
+        a2, a3 = country["Alpha_2"], country["Alpha_3"]
+        a3_map[a2] = a3
+        slot_map[a2] = slot_map[a3] = slot
+        population.append(country["Population"])
+
+    return a3_map, slot_map, population
+
+
+# Reference data is static, so it is loaded exactly once when the module is first imported
+_a3_map, _slot_map, _population = _initialize()
+
+
+def get_alpha_3(alpha_2: str) -> t.Optional[str]:
+    """
+    Get Alpha-3 code for Alpha-2 `alpha_2` code caseless.
+
+    None if `alpha_2` does not exist in the reference table.
+    """
+    return _a3_map.get(alpha_2.upper())
+
+
+def get_population(country_code: str) -> int:
+    """
+    Get population for either Alpha-2 or Alpha-3 `country_code` caseless.
+
+    Zero if `country_code` does not exist in the reference table.
+    """
+    if (slot := _slot_map.get(country_code.upper())) is None:
+        return 0
+    return _population[slot]
@@ -0,0 +1,52 @@
+import logging
+import typing as t
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from ryan.exts.corona.aggregate import Aggregates
+from ryan.exts.corona.country import CountryMap, CountryTable
+
+log = logging.getLogger(__name__)
+
+EXECUTORS = ("inline", "thread", "process")  # Where `build_state` can run, see `make_executor`
+
+
+class State(t.NamedTuple):
+    """
+    Everything derived from a single API response.
+
+    Once built, a state is never mutated - a refresh builds a new one and swaps it in whole.
+    """
+
+    country_map: CountryMap
+    aggregates: Aggregates
+
+
+def build_state(table: CountryTable, timestamp: datetime) -> State:
+    """
+    Build state from `table` acquired at `timestamp`.
+
+    This is the CPU-heavy part of a refresh, and is safe to run in any thread or process,
+    as it only touches its arguments. All parts must remain picklable for the latter.
+    """
+    return State(CountryMap(table, timestamp), Aggregates(table))
+
+
+def make_executor(kind: str) -> t.Optional[Executor]:
+    """
+    Create executor of `kind` to run `build_state` in.
+
+    Inline means on the event loop, in which case None is given. A thread keeps the loop
+    responsive, as the interpreter switches threads periodically, but the work still competes
+    for the GIL. A process avoids that, at the cost of pickling the table & state across.
+    """
+    if kind not in EXECUTORS:
+        raise ValueError(f"Executor kind must be one of: {', '.join(EXECUTORS)}")
+
+    log.info(f"Corona state will be built: {kind}")
+
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="corona")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=1)
+    return None
@@ -0,0 +1,157 @@
+import codecs
+import enum
+import json
+import logging
+import re
+import typing as t
+
+log = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_INCOMPLETE = object()  # Sentinel signaling that a value could not be decoded from the buffer yet
+
+
+class _State(enum.Enum):
+    """Position of the decoder within the document."""
+
+    OBJECT_START = enum.auto()  # Expecting the opening brace
+    KEY_OR_END = enum.auto()  # Expecting the first key, or the closing brace of an empty object
+    KEY = enum.auto()  # Expecting a key after a comma
+    COLON = enum.auto()  # Expecting a colon after a key
+    VALUE = enum.auto()  # Expecting a member value
+    MEMBER_SEP = enum.auto()  # Expecting a comma, or the closing brace
+    ITEM_OR_END = enum.auto()  # Expecting the first item, or the closing bracket of an empty array
+    ITEM = enum.auto()  # Expecting an item after a comma
+    ITEM_SEP = enum.auto()  # Expecting a comma, or the closing bracket
+    DONE = enum.auto()  # Document complete
+
+
+class StreamDecoder:
+    """
+    Incrementally decode items of one array member of a top-level JSON object.
+
+    Bytes are fed in chunks as they arrive, and each call gives back the array items which
+    were completed by the chunk. Only a single item is ever decoded at a time, so the full
+    document tree never exists in memory. All other top-level members are decoded whole
+    into `members`, they are expected to be small.
+
+    This only understands the shape `{"key": [item, ...], "other": value, ...}`. Anything
+    else raises ValueError, as does a stream which ends before the document is complete.
+    """
+
+    def __init__(self, key: str) -> None:
+        """Prepare decoder streaming items of the array under `key`."""
+        self.key = key
+        self.members: t.Dict[str, t.Any] = {}
+
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("UTF-8")()
+
+        self._buffer = ""
+        self._pos = 0
+
+        self._state = _State.OBJECT_START
+        self._member: t.Optional[str] = None  # Key of the member currently being decoded
+
+    def feed(self, chunk: bytes) -> t.List[t.Any]:
+        """Consume `chunk` & return all array items completed by it."""
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return list(self._advance(final=False))
+
+    def close(self) -> t.List[t.Any]:
+        """
+        Signal end of stream & return remaining array items.
+
+        Raise ValueError if the document is not complete.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"", final=True)
+        self._pos = 0
+        items = list(self._advance(final=True))
+
+        if self._state is not _State.DONE:
+            raise ValueError(f"Stream ended before the document was complete (state: {self._state.name})")
+
+        return items
+
+    def _decode(self, final: bool) -> t.Any:
+        """
+        Decode a single value at the current position, or return `_INCOMPLETE`.
+
+        A value reaching the very end of the buffer may be a truncated number or literal,
+        so it is only accepted once we know that no more data is coming.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE
+
+        if end == len(self._buffer) and not final:
+            return _INCOMPLETE
+
+        self._pos = end
+        return value
+
+    def _advance(self, final: bool) -> t.Iterator[t.Any]:
+        """Walk the buffer as far as possible, yielding completed array items."""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos >= len(self._buffer):
+                return
+
+            char = self._buffer[self._pos]
+            state = self._state
+
+            if state is _State.OBJECT_START and char == "{":
+                self._pos += 1
+                self._state = _State.KEY_OR_END
+
+            elif state in (_State.KEY_OR_END, _State.KEY) and char == '"':
+                if (key := self._decode(final)) is _INCOMPLETE:
+                    return
+                self._member = key
+                self._state = _State.COLON
+
+            elif state is _State.KEY_OR_END and char == "}":
+                self._pos += 1
+                self._state = _State.DONE
+
+            elif state is _State.COLON and char == ":":
+                self._pos += 1
+                self._state = _State.VALUE
+
+            elif state is _State.VALUE and self._member == self.key:
+                if char != "[":
+                    raise ValueError(f"Member '{self.key}' is not an array")
+                self._pos += 1
+                self._state = _State.ITEM_OR_END
+
+            elif state is _State.VALUE:
+                if (value := self._decode(final)) is _INCOMPLETE:
+                    return
+                self.members[self._member] = value
+                self._state = _State.MEMBER_SEP
+
+            elif state is _State.MEMBER_SEP and char in ",}":
+                self._pos += 1
+                self._state = _State.KEY if char == "," else _State.DONE
+
+            elif state is _State.ITEM_OR_END and char == "]":
+                self._pos += 1
+                self._state = _State.MEMBER_SEP
+
+            elif state in (_State.ITEM_OR_END, _State.ITEM):
+                if (item := self._decode(final)) is _INCOMPLETE:
+                    return
+                self._state = _State.ITEM_SEP
+                yield item
+
+            elif state is _State.ITEM_SEP and char in ",]":
+                self._pos += 1
+                self._state = _State.ITEM if char == "," else _State.MEMBER_SEP
+
+            else:
+                raise ValueError(f"Unexpected character {char!r} in state {state.name}")
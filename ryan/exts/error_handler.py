@@ -1,14 +1,17 @@
-import contextlib
+import asyncio
+import enum
 import logging
 import random
+import time
 import typing as t
+from collections import Counter, deque
 
 from discord import DiscordException
 from discord.ext import commands
 
 from ryan.bot import Ryan
 from ryan.config import Emoji
-from ryan.utils import msg_error
+from ryan.utils import msg_error, msg_success
 
 log = logging.getLogger(__name__)
 
@@ -26,38 +29,123 @@ FALLBACK = "Unexpected exception handled, see log for details"
 
 EMOJI_POOL = (Emoji.weary, Emoji.angry, Emoji.frown, Emoji.upside_down, Emoji.pensive)
 
+BURST_LIMIT = 3  # Errors answered one by one per channel within `BURST_WINDOW`, further ones are summarized
+BURST_WINDOW = 10  # Seconds
+RATE_WINDOW = 60 * 60  # Seconds of errors kept to compute rates
+
 
 def random_emoji() -> str:
     """Draw random emoji from `EMOJI_POOL`."""
     return random.choice(EMOJI_POOL)
 
 
+class ResponseResolver:
+    """
+    Resolve exception types to response messages.
+
+    A type resolves to the response of the first of its MRO classes which has one, so the most
+    specific response wins regardless of the order of `messages`, and subclasses without their own
+    response inherit it. Resolution is memoized per concrete type, since the same few types are
+    raised over & over.
+    """
+
+    def __init__(self, messages: t.Iterable[ErrorMessage], fallback: str) -> None:
+        """Resolve by `messages`, or to `fallback` if no class in the MRO has a message."""
+        self.messages: t.Dict[t.Type[Exception], str] = dict(messages)
+        self.fallback = fallback
+
+        self._memo: t.Dict[t.Type[BaseException], str] = {}
+
+    def resolve(self, exception_type: t.Type[BaseException]) -> str:
+        """Get response for `exception_type`, resolving it only on first encounter."""
+        if (response := self._memo.get(exception_type)) is None:
+            matches = (self.messages[cls] for cls in exception_type.__mro__ if cls in self.messages)
+            response = next(matches, self.fallback)
+            log.debug(f"Resolved exception type: {exception_type} (message: {response})")
+            self._memo[exception_type] = response
+
+        return response
+
+
+resolver = ResponseResolver(MESSAGES, FALLBACK)
+
+
 def match_response(exception_instance: Exception) -> str:
     """
-    Match `exception_instance` to a response message, if defined in `MESSAGES`.
+    Match `exception_instance` to a response message, see `ResponseResolver`.
+
+    If no match is found, `FALLBACK` is returned instead - some response is always given.
+    """
+    response = resolver.resolve(type(exception_instance))
+
+    # If the string contains an emoji placeholder, inject a random one, but otherwise we do nothing
+    return response.format(emoji=random_emoji())
+
+
+class Answer(enum.Enum):
+    """How to answer an error, see `ErrorTracker.record`."""
+
+    RESPOND = enum.auto()  # Respond to the error on its own
+    SUMMARIZE = enum.auto()  # First error of a burst, summarize the burst once it passes
+    SUPPRESS = enum.auto()  # Error of an ongoing burst, it will be summarized
 
-    If not match is found, `FALLBACK` is returned instead - some response is always given.
 
-    The reason why `MESSAGES` isn't a mapping is that using the types as keys would disallow
-    the use of `isinstance` to correctly recognize subclasses.
+class ErrorTracker:
     """
-    log.debug(f"Matching exception: {type(exception_instance)}")
+    Count errors per type & detect bursts of errors per channel.
 
-    for exception_type, response in MESSAGES:
+    A channel is bursting when more than `BURST_LIMIT` errors occur in it within `BURST_WINDOW`
+    seconds. Errors are then collected instead of answered, until the burst is summarized.
+    """
+
+    def __init__(self) -> None:
+        """Prepare empty tracker."""
+        self.totals: t.Counter[str] = Counter()  # Errors by type name since start
+        self.recent: t.Deque[t.Tuple[float, str]] = deque()  # Time & type name of errors within `RATE_WINDOW`
+        self.suppressed: t.Dict[int, t.Counter[str]] = {}  # Errors of ongoing bursts by channel ID
+
+        self._latest: t.Dict[int, t.Deque[float]] = {}  # Times of latest answered errors by channel ID
+
+    def record(self, channel_id: int, error: Exception) -> Answer:
+        """Count `error` raised in channel `channel_id` & decide how to answer it."""
+        now, name = time.monotonic(), type(error).__name__
+        self.totals[name] += 1
+        self.recent.append((now, name))
+        while self.recent[0][0] < now - RATE_WINDOW:
+            self.recent.popleft()
+
+        if (burst := self.suppressed.get(channel_id)) is not None:
+            burst[name] += 1
+            return Answer.SUPPRESS
 
-        if isinstance(exception_instance, exception_type):
-            log.debug(f"Exception matched to type: {exception_type} (message: {response})")
+        latest = self._latest.setdefault(channel_id, deque(maxlen=BURST_LIMIT))
+        if len(latest) == BURST_LIMIT and now - latest[0] < BURST_WINDOW:
+            self.suppressed[channel_id] = Counter({name: 1})
+            return Answer.SUMMARIZE
 
-            # If the string contains an emoji placeholder, inject a random one,
-            # but otherwise we do nothing (exc raised on no placeholder)
-            with contextlib.suppress(KeyError):
-                response = response.format(emoji=random_emoji())
-                log.debug(f"Injected emoji: {response}")
+        latest.append(now)
+        return Answer.RESPOND
 
-            return response
+    def end_burst(self, channel_id: int) -> t.Counter[str]:
+        """End burst in channel `channel_id`, return its errors by type name."""
+        self._latest.pop(channel_id, None)
+        return self.suppressed.pop(channel_id)
 
-    log.debug(f"No match found, using fallback: {FALLBACK}")
-    return FALLBACK
+    def rates(self) -> t.Dict[str, float]:
+        """Errors per hour by type name, averaged over `RATE_WINDOW`."""
+        counts = Counter(name for _, name in self.recent)
+        return {name: count * 60 * 60 / RATE_WINDOW for name, count in counts.items()}
+
+    def describe(self) -> str:
+        """Format error counts & rates for humans."""
+        if not self.totals:
+            return "No errors so far"
+
+        rates = self.rates()
+        return "\n".join(
+            f"{name}: `{total:,}` total, `{rates.get(name, 0):,.1f}` per hour"
+            for name, total in self.totals.most_common()
+        )
 
 
 class ErrorHandler(commands.Cog):
@@ -65,6 +153,25 @@ class ErrorHandler(commands.Cog):
 
     def __init__(self, bot: Ryan) -> None:
         self.bot = bot
+        self.tracker = ErrorTracker()
+        self.summaries: t.Set[asyncio.Task] = set()  # Pending burst summaries
+
+    def cog_unload(self) -> None:
+        """Drop pending burst summaries."""
+        for task in self.summaries:
+            task.cancel()
+
+    async def summarize(self, ctx: commands.Context) -> None:
+        """Wait for the burst in the channel of `ctx` to pass, then answer its errors in a single response."""
+        await asyncio.sleep(BURST_WINDOW)
+        burst = self.tracker.end_burst(ctx.channel.id)
+
+        counts = ", ".join(f"{name} (`{count}`)" for name, count in burst.most_common())
+        response = f"Further `{sum(burst.values())}` errors in `{BURST_WINDOW}` seconds: {counts} {random_emoji()}"
+        try:
+            await ctx.send(embed=msg_error(response))
+        except DiscordException as response_error:
+            log.exception("Failed to send burst summary", exc_info=response_error)
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: Exception) -> None:
@@ -75,27 +182,44 @@ class ErrorHandler(commands.Cog):
         but its message will not propagate to the user.
 
         In case we do not match `error` to anything, a generic response `FALLBACK` is used as response.
+
+        If errors come in a burst, see `ErrorTracker`, they are not answered one by one, but summarized
+        in a single response once the burst passes.
         """
         original_exception = getattr(error, "original", None)
         log.debug(f"Error handler received exception of type: {type(error)}, original: {type(original_exception)}")
 
-        # This guarantees to always return some string - a fallback is used when no match is found
-        response = match_response(error)
+        answer = self.tracker.record(ctx.channel.id, error)
 
-        # Use the generic error response generator, which wraps the message in a red embed
-        response_embed = msg_error(response)
+        if answer is Answer.RESPOND:
+            # This guarantees to always return some string - a fallback is used when no match is found
+            response = match_response(error)
 
-        # The bot may not be able to respond, e.g. due to permissions - let's be safe
-        try:
-            await ctx.send(embed=response_embed)
-        except DiscordException as response_error:
-            log.exception("Failed to send response embed", exc_info=response_error)
+            # Use the generic error response generator, which wraps the message in a red embed
+            response_embed = msg_error(response)
+
+            # The bot may not be able to respond, e.g. due to permissions - let's be safe
+            try:
+                await ctx.send(embed=response_embed)
+            except DiscordException as response_error:
+                log.exception("Failed to send response embed", exc_info=response_error)
+
+        elif answer is Answer.SUMMARIZE:
+            log.info(f"Burst of errors in channel {ctx.channel.id}, summarizing in {BURST_WINDOW} seconds")
+            task = asyncio.create_task(self.summarize(ctx))
+            self.summaries.add(task)
+            task.add_done_callback(self.summaries.discard)
 
         # The idea is to only log the full traceback if we've encountered a non-Discord exception
         # This may need to be revisited at some point in the future - maybe we need more information
         if original_exception is not None:
             log.exception("Error handler received non-Discord exception", exc_info=error)
 
+    @commands.command(name="errors")
+    async def cmd_errors(self, ctx: commands.Context) -> None:
+        """Show errors handled so far, by type."""
+        await ctx.send(embed=msg_success(self.tracker.describe()))
+
 
 def setup(bot: Ryan) -> None:
     """Load ErrorHandler cog."""
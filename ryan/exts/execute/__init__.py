@@ -0,0 +1,11 @@
+from ryan.bot import Ryan
+from ryan.exts.execute.cog import Execute
+from ryan.exts.execute.pool import WorkerPool
+from ryan.exts.execute.run import ExitCode, Result, run_code
+
+__all__ = ["Execute", "ExitCode", "Result", "WorkerPool", "run_code", "setup"]
+
+
+def setup(bot: Ryan) -> None:
+    """Load the Execute cog."""
+    bot.add_cog(Execute(bot))
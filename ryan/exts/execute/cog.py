@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import io
+import logging
+import re
+import typing as t
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from ryan.bot import Ryan
+from ryan.config import Users
+from ryan.exts.execute.measure import Measure, TIMEIT_DEFAULT, measure_code
+from ryan.exts.execute.output import RingBuffer
+from ryan.exts.execute.pool import WorkerPool
+from ryan.exts.execute.reply import LiveOutput, render_output
+from ryan.exts.execute.run import ExitCode, Result
+from ryan.exts.execute.session import SessionStore
+from ryan.utils import msg_error, msg_success
+
+log = logging.getLogger(__name__)
+
+# Leading flags of the execute command, e.g. `--local`, some take a number, e.g. `--timeit 100`
+FLAG_REGEX = re.compile(r"^\s*--(?P<name>[a-z]+)(\s+|$)")
+VALUE_REGEX = re.compile(r"^(?P<value>\d+)(\s+|$)")
+VALUE_FLAGS = {"timeit"}  # Flags which take a number
+FLAGS = {"local", "profile", "reset", "session", "stream", *VALUE_FLAGS}  # All known flags
+
+Flags = t.Dict[str, t.Optional[int]]
+
+
+def split_flags(raw_code: str) -> t.Tuple[Flags, str]:
+    """
+    Split leading flags off `raw_code`, return them by name with their values & the remaining code.
+
+    Any `--word` is split off, whether it is known or not, see `FLAGS`.
+    """
+    flags: Flags = {}
+    while match := FLAG_REGEX.match(raw_code):
+        name, raw_code = match["name"], raw_code[match.end():]
+        flags[name] = None
+
+        if name in VALUE_FLAGS and (value := VALUE_REGEX.match(raw_code)):
+            flags[name] = int(value["value"])
+            raw_code = raw_code[value.end():]
+
+    return flags, raw_code
+
+
+class Execute(commands.Cog):
+    """
+    Support for code injection & evaluation at runtime.
+
+    This cog allows execution of arbitrary code at the host machine with no sand-boxing
+    in place. Clearly this is super dangerous, and only trusted users should be given
+    invocation rights.
+    """
+
+    def __init__(self, bot: Ryan) -> None:
+        self.bot = bot
+        self.pool = WorkerPool()
+        self.sessions = SessionStore()
+        self.profile_lock = asyncio.Lock()  # Held by in-process runs under cProfile, see `in_process`
+        self.pool_task = bot.loop.create_task(self.pool.start())
+
+    def cog_unload(self) -> None:
+        """Kill worker processes."""
+        self.pool_task.cancel()
+        self.pool.stop()
+
+    def cog_check(self, ctx: commands.Context) -> bool:
+        """Permit only a specific user id to operate the extension."""
+        return ctx.author.id == Users.kwzrd
+
+    @contextlib.asynccontextmanager
+    async def in_process(self, measure: Measure) -> t.AsyncIterator[None]:
+        """
+        Guard an in-process run with `measure`.
+
+        A cProfile profiler collects calls of the whole thread, not just of the task which enabled it,
+        so concurrent profiled runs would mix their profiles, or fail to enable the profiler at all
+        on Python 3.12+. These runs thus wait for each other. Workers each run one job at a time.
+        """
+        if not measure.profile:
+            yield
+            return
+
+        async with self.profile_lock:
+            yield
+
+    async def run(
+        self, ctx: commands.Context, flags: Flags, raw_code: str, out_feed: t.Optional[RingBuffer],
+    ) -> t.Tuple[str, Result]:
+        """Run `raw_code` on the backend chosen by `flags`, return the backend's name & the result."""
+        repeat = (flags["timeit"] or TIMEIT_DEFAULT) if "timeit" in flags else 1
+        measure = Measure(profile="profile" in flags, repeat=repeat)
+
+        if "session" in flags:
+            session = self.sessions.get(ctx.channel.id)
+            session.namespace.update(bot=self.bot, ctx=ctx)
+            session.touch()
+            async with self.in_process(measure):
+                return "session", await measure_code(raw_code, session.namespace, measure, True, out_feed)
+
+        if "local" in flags:
+            in_locals = {"self": self, "bot": self.bot, "ctx": ctx}
+            async with self.in_process(measure):
+                return "local", await measure_code(raw_code, in_locals, measure, out_feed=out_feed)
+
+        return "worker", await self.pool.run(raw_code, out_feed, measure)
+
+    @staticmethod
+    async def send_report(ctx: commands.Context, flags: Flags, result: Result) -> None:
+        """Send measurements in `result`, with the full measurements attached."""
+        title = "Profile: top functions by own time" if "profile" in flags else "Timing"
+        filename = "profile.txt" if "profile" in flags else "timeit.txt"
+
+        report, _ = render_output(result.report)
+        embed = discord.Embed(title=title, description=f"```\n{report}```", colour=discord.Colour.blue())
+        file = discord.File(io.BytesIO(result.details.encode()), filename=filename)
+        await ctx.send(embed=embed, file=file)
+
+    @commands.command("execute", aliases=["exec"])
+    async def execute(self, ctx: commands.Context, *, raw_code: str) -> None:
+        """
+        Attempt to compile & execute `raw_code` and expose stdout.
+
+        By default, the code runs in a worker process from `WorkerPool`, where it cannot block
+        the bot & is reliably killed on timeout. Code which needs access to the bot, e.g. via
+        `self.bot` or `ctx`, can be run in-process by passing the `--local` flag first.
+
+        With the `--session` flag, the code runs in-process in this channel's session, where
+        names assigned at the top level persist across runs, until the session is idle for
+        `SESSION_IDLE` seconds. The session is dropped with `--reset`, which can be given
+        alone, or together with code to run in a fresh session.
+
+        With `--profile`, the code runs under cProfile, and with `--timeit N`, it runs `N` times
+        (`TIMEIT_DEFAULT` unless given). Either way, a summary is sent after the result, with
+        the full measurements attached.
+
+        With the `--stream` flag, output is shown while the code runs, in a message which is
+        edited periodically, see `LiveOutput`. Output too long for an embed is attached as
+        a file, in any mode.
+
+        This method merely passes `raw_code`, otherwise unprocessed, to `run_code`. Once the
+        coroutine finishes, we prepare a pretty response embed and return it to `ctx`.
+        """
+        flags, raw_code = split_flags(raw_code)
+
+        if unknown := flags.keys() - FLAGS:
+            unknown_list = ", ".join(f"`--{name}`" for name in sorted(unknown))
+            known_list = ", ".join(f"`--{name}`" for name in sorted(FLAGS))
+            await ctx.send(embed=msg_error(f"Unknown flags: {unknown_list}\nKnown flags: {known_list}"))
+            return
+
+        if "reset" in flags:
+            dropped = self.sessions.drop(ctx.channel.id)
+            if not raw_code.strip():
+                await ctx.send(embed=msg_success("Session reset" if dropped else "There was no session"))
+                return
+
+        live = None
+        out_feed = RingBuffer() if "stream" in flags else None
+        if out_feed is not None:
+            live = LiveOutput(await ctx.send(embed=discord.Embed(description="Starting...")), out_feed)
+            live.start()
+
+        start_time = datetime.now()
+
+        try:
+            async with ctx.typing():
+                backend, result = await self.run(ctx, flags, raw_code, out_feed)
+        finally:
+            if live is not None:
+                live.stop()
+
+        # When streaming, the output is in the feed, otherwise in the result - unless it failed
+        if out_feed is not None and result.exit_code is ExitCode.SUCCESS:
+            output, file = render_output(out_feed.getvalue() or "[No output]", out_feed.dropped)
+        else:
+            output, file = render_output(result.out_message, result.dropped)
+
+        time_diff = (datetime.now() - start_time).total_seconds()
+        response = (
+            f"Finished with: `{result.exit_code} | {time_diff} secs | {backend}`\n"
+            f"Compile: `{result.compile_time * 1000:,.2f} ms`{' (cached)' if result.cached else ''}, "
+            f"run: `{result.run_time * 1000:,.0f} ms`\n"
+            f"```\n{output}```"  # Newline necessary to avoid markdown codeblock lang definition
+        )
+        make_embed = msg_success if result.exit_code is ExitCode.SUCCESS else msg_error
+
+        if live is not None:
+            await live.message.edit(embed=make_embed(response))
+            if file is not None:
+                await ctx.send(file=file)
+        else:
+            await ctx.send(embed=make_embed(response), file=file)
+
+        if result.report:
+            await self.send_report(ctx, flags, result)
@@ -0,0 +1,92 @@
+import cProfile
+import io
+import logging
+import pstats
+import statistics
+import typing as t
+
+from ryan.exts.execute.output import RingBuffer
+from ryan.exts.execute.run import Result, run_code
+
+log = logging.getLogger(__name__)
+
+PROFILE_TOP = 15  # Functions shown in the hotspot table
+DETAILS_MAX = 512 * 1024  # Characters of full measurements kept
+TIMEIT_DEFAULT = 10  # Runs for timing, unless given
+TIMEIT_MAX = 1000  # Most runs allowed for timing
+
+
+class Measure(t.NamedTuple):
+    """What to measure while running code, the default measures nothing."""
+
+    profile: bool = False
+    repeat: int = 1
+
+    def __bool__(self) -> bool:
+        """Whether anything is measured at all."""
+        return self.profile or self.repeat > 1
+
+
+def profile_report(profiler: cProfile.Profile) -> t.Tuple[str, str]:
+    """Format `profiler` stats as a table of top functions by own time, and in full by cumulative time."""
+    def render(sort: str, amount: t.Optional[int]) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(amount)
+        return stream.getvalue()
+
+    # Skip the preamble, which is the same every time, and keep only the table itself
+    table = render(pstats.SortKey.TIME, PROFILE_TOP)
+    table = table[table.find("   ncalls"):].rstrip()
+
+    return table, render(pstats.SortKey.CUMULATIVE, None)[:DETAILS_MAX]
+
+
+def timeit_report(run_times: t.Sequence[float]) -> t.Tuple[str, str]:
+    """Summarize `run_times`, and list each of them in full."""
+    table = (
+        f"runs:   {len(run_times)}\n"
+        f"min:    {min(run_times) * 1000:,.3f} ms\n"
+        f"median: {statistics.median(run_times) * 1000:,.3f} ms\n"
+        f"mean:   {statistics.mean(run_times) * 1000:,.3f} ms\n"
+        f"max:    {max(run_times) * 1000:,.3f} ms"
+    )
+    if len(run_times) > 1:
+        table += f"\nstdev:  {statistics.stdev(run_times) * 1000:,.3f} ms"
+
+    details = "\n".join(f"{i}\t{run_time * 1000:.6f} ms" for i, run_time in enumerate(run_times, start=1))
+    return table, details[:DETAILS_MAX]
+
+
+async def measure_code(
+    in_text: str,
+    in_locals: t.Dict[str, t.Any],
+    measure: Measure,
+    session: bool = False,
+    out_feed: t.Optional[RingBuffer] = None,
+) -> Result:
+    """
+    Run code via `run_code` while measuring it, the measurements are in `report` & `details` of the result.
+
+    Profiling uses cProfile, which is deterministic & adds overhead to every function call,
+    so timings of profiled runs are inflated. When running in-process, other tasks running
+    on the event loop while the code awaits are profiled as well. As the profiler is global
+    to the thread, profiled runs in one process must not overlap, see `Execute.in_process`.
+
+    If nothing is to be measured, this is the same as `run_code`.
+    """
+    profiler = cProfile.Profile() if measure.profile else None
+    result = await run_code(in_text, in_locals, session, out_feed, min(measure.repeat, TIMEIT_MAX), profiler)
+
+    if not result.run_times:  # Failed to compile, there is nothing to report
+        return result
+
+    if profiler is not None:
+        report, details = profile_report(profiler)
+    elif measure.repeat > 1:
+        report, details = timeit_report(result.run_times)
+    else:
+        return result
+
+    log.debug(f"Measured code: {measure}")
+    return result._replace(report=report, details=details)
@@ -0,0 +1,128 @@
+import contextlib
+import io
+import logging
+import sys
+import typing as t
+from collections import deque
+from contextvars import ContextVar
+
+log = logging.getLogger(__name__)
+
+RING_SIZE = 256 * 1024  # Characters of output kept, older output is dropped
+
+# Where stdout goes in the current context, None means the real stdout
+_stdout_target: ContextVar[t.Optional[t.TextIO]] = ContextVar("stdout_target", default=None)
+
+
+class RingBuffer(io.TextIOBase):
+    """
+    Text sink keeping only the last `maxlen` characters written to it.
+
+    This bounds the memory used by a chatty snippet, while keeping the most recent output,
+    which is usually the most interesting. Everything written is counted, so the amount
+    of dropped output can be reported.
+    """
+
+    def __init__(self, maxlen: int = RING_SIZE) -> None:
+        """Create empty buffer."""
+        self.maxlen = maxlen
+        self.written = 0  # Characters written in total, including dropped ones
+
+        self._chunks: t.Deque[str] = deque()
+        self._size = 0  # Characters currently kept
+
+    def writable(self) -> bool:
+        """Buffer is always writable."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Append `text`, dropping the oldest output if over capacity."""
+        self.written += len(text)
+        self._chunks.append(text)
+        self._size += len(text)
+
+        while self._size > self.maxlen:
+            excess = self._size - self.maxlen
+            oldest = self._chunks[0]
+            if len(oldest) <= excess:
+                self._chunks.popleft()
+                self._size -= len(oldest)
+            else:
+                self._chunks[0] = oldest[excess:]
+                self._size -= excess
+
+        return len(text)
+
+    def skip(self, amount: int) -> None:
+        """Count `amount` characters which were dropped before reaching this buffer."""
+        self.written += amount
+
+    @property
+    def dropped(self) -> int:
+        """Amount of characters written but no longer kept."""
+        return self.written - self._size
+
+    def getvalue(self) -> str:
+        """Get all kept output."""
+        if len(self._chunks) > 1:
+            self._chunks = deque(["".join(self._chunks)])
+        return self._chunks[0] if self._chunks else ""
+
+    def tail(self, amount: int) -> str:
+        """Get the last `amount` kept characters."""
+        return self.getvalue()[-amount:]
+
+    def clear(self) -> None:
+        """Drop all kept output, counters are kept."""
+        self._chunks.clear()
+        self._size = 0
+
+
+class StdoutProxy(io.TextIOBase):
+    """
+    Stand-in for `sys.stdout` routing each write to the target of the current context.
+
+    Unlike `contextlib.redirect_stdout`, which swaps the process-wide `sys.stdout`, this makes
+    capture local to a context. Tasks inherit the context they were created in, so everything
+    the captured code runs or schedules writes to its own target, while any other task writes
+    to the real stdout, even when they interleave at await points.
+    """
+
+    def __init__(self, real: t.TextIO) -> None:
+        """Route writes outside of any capture to `real`."""
+        self.real = real
+
+    def writable(self) -> bool:
+        """Proxy is always writable."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Write `text` to the target of the current context."""
+        return (_stdout_target.get() or self.real).write(text)
+
+    def flush(self) -> None:
+        """Flush the target of the current context."""
+        (_stdout_target.get() or self.real).flush()
+
+    def fileno(self) -> int:
+        """Give the descriptor of the real stdout, e.g. for subprocesses."""
+        return self.real.fileno()
+
+
+@contextlib.contextmanager
+def capture_stdout(target: t.TextIO) -> t.Iterator[t.TextIO]:
+    """
+    Capture stdout of the current context into `target`, see `StdoutProxy`.
+
+    The proxy is installed into `sys.stdout` on first use & stays there, it is transparent
+    outside of captures.
+    """
+    if not isinstance(sys.stdout, StdoutProxy):
+        log.debug("Installing stdout proxy")
+        sys.stdout = StdoutProxy(sys.stdout)
+
+    token = _stdout_target.set(target)
+    try:
+        yield target
+    finally:
+        _stdout_target.reset(token)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import typing as t
+from pathlib import Path
+
+from ryan.exts.execute.measure import Measure, TIMEIT_MAX
+from ryan.exts.execute.output import RingBuffer
+from ryan.exts.execute.run import ExitCode, Result, T_MAX
+
+log = logging.getLogger(__name__)
+
+POOL_SIZE = 2  # Workers kept running, i.e. how many snippets can run in parallel
+GRACE = 5  # Seconds on top of `T_MAX` before a worker is killed, it should time out by itself first
+STREAM_LIMIT = 1024 ** 2  # Bytes, must fit a single response line, see `worker.OUTPUT_MAX`
+IDLE_WAIT = 30  # Seconds to wait for an idle worker before giving up
+SPAWN_BACKOFF, SPAWN_BACKOFF_MAX = 1, 60  # Seconds between attempts to respawn a worker, doubled after each failure
+
+WORKER_SCRIPT = Path(__file__).with_name("worker.py")  # Run by path, so that the bot's package is never imported
+WORKER_ENV = ("PATH", "LANG", "LC_ALL", "LC_CTYPE", "TZ", "TMPDIR")  # Only variables passed to workers, not secrets
+
+
+class Worker:
+    """A single worker process, see `worker.main`."""
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        """Wrap running `process`."""
+        self.process = process
+        self.jobs = 0  # Jobs served so far
+
+    @classmethod
+    async def spawn(cls) -> "Worker":
+        """
+        Start new worker process.
+
+        The worker runs untrusted code, so it's started in isolated mode, see `python -I`, with only
+        `WORKER_ENV` variables, and it doesn't import anything of the bot, see `worker`.
+        """
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env={name: os.environ[name] for name in WORKER_ENV if name in os.environ},
+            limit=STREAM_LIMIT,
+        )
+        log.debug(f"Spawned worker: {process.pid}")
+        return cls(process)
+
+    async def run(self, code: str, out_feed: t.Optional[RingBuffer], measure: Measure) -> Result:
+        """
+        Send `code` & wait for the result, raise `EOFError` if the process dies.
+
+        If `out_feed` is given, output is streamed into it while the code runs.
+        """
+        request = {
+            "code": code,
+            "stream": out_feed is not None,
+            "profile": measure.profile,
+            "repeat": min(measure.repeat, TIMEIT_MAX),
+            "timeout": T_MAX,
+        }
+        self.process.stdin.write(json.dumps(request).encode() + b"\n")
+        await self.process.stdin.drain()
+
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise EOFError("Worker exited without responding")
+
+            response = json.loads(line)
+            if "exit_code" in response:
+                break
+
+            out_feed.skip(response["dropped"])
+            out_feed.write(response["chunk"])
+
+        self.jobs += 1
+        return Result(**{**response, "exit_code": ExitCode(response["exit_code"])})
+
+    def kill(self) -> None:
+        """Kill the process, if it's still running."""
+        if self.process.returncode is None:
+            self.process.kill()
+
+
+class WorkerPool:
+    """
+    Pool of pre-warmed worker processes executing code in parallel, off the event loop.
+
+    Unlike in-process execution, a snippet running in a worker can neither block the bot nor
+    outlive its time limit: a worker which doesn't respond within `T_MAX` + `GRACE` seconds
+    is killed & replaced. Workers are also limited in memory & CPU time, and a worker killed
+    by either limit is replaced in the same way. If a replacement fails to spawn, spawning is
+    retried with backoff until it succeeds.
+
+    The price is that snippets have no access to the bot, and nothing persists between runs
+    except what the worker process happens to keep, e.g. imported modules.
+    """
+
+    def __init__(self, size: int = POOL_SIZE) -> None:
+        """Prepare pool of `size` workers, they only spawn once `start` is called."""
+        self.size = size
+        self.idle: asyncio.Queue[Worker] = asyncio.Queue()
+        self.workers: t.Set[Worker] = set()
+
+        self.kills = 0  # Workers killed or died during a job, and replaced
+        self.stopped = False
+
+    async def _spawn(self) -> bool:
+        """Spawn a worker & make it available, return whether it succeeded."""
+        try:
+            worker = await Worker.spawn()
+        except OSError as spawn_exc:
+            log.error("Failed to spawn execute worker", exc_info=spawn_exc)
+            return False
+
+        if self.stopped:  # Stopped while spawning
+            worker.kill()
+            return True
+        self.workers.add(worker)
+        self.idle.put_nowait(worker)
+        return True
+
+    async def _spawn_retrying(self) -> None:
+        """Spawn a worker, retrying with backoff until it succeeds or the pool is stopped."""
+        delay = SPAWN_BACKOFF
+        while not self.stopped and not await self._spawn():
+            log.info(f"Retrying to spawn execute worker in {delay} seconds")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SPAWN_BACKOFF_MAX)
+
+    async def start(self) -> None:
+        """Spawn all workers."""
+        log.info(f"Starting pool of {self.size} execute workers")
+        await asyncio.gather(*(self._spawn_retrying() for _ in range(self.size)))
+
+    def stop(self) -> None:
+        """Kill all workers."""
+        log.info("Stopping execute worker pool")
+        self.stopped = True
+        for worker in self.workers:
+            worker.kill()
+        self.workers.clear()
+
+    async def _replace(self, worker: Worker) -> None:
+        """Kill `worker` & spawn a new one in its place."""
+        self.kills += 1
+        worker.kill()
+        await worker.process.wait()
+        self.workers.discard(worker)
+        await self._spawn_retrying()
+
+    async def run(self, code: str, out_feed: t.Optional[RingBuffer] = None, measure: Measure = Measure()) -> Result:
+        """
+        Run `code` in the next idle worker, see `run_code` for the return value.
+
+        If `out_feed` is given, output is streamed into it while the code runs. The code is
+        measured according to `measure`, see `measure_code`. Measured runs are still subject
+        to the time limit of the worker, across all runs.
+
+        If there are no workers, e.g. because they fail to respawn, or none becomes idle within
+        `IDLE_WAIT` seconds, a failed result is given instead.
+        """
+        if not self.workers:
+            return Result(ExitCode.FAIL_UNAVAILABLE, "No execute workers are running, try again later")
+
+        try:
+            worker = await asyncio.wait_for(self.idle.get(), timeout=IDLE_WAIT)
+        except asyncio.TimeoutError:
+            return Result(ExitCode.FAIL_UNAVAILABLE, f"No execute worker became available in {IDLE_WAIT} seconds")
+
+        try:
+            result = await asyncio.wait_for(worker.run(code, out_feed, measure), timeout=T_MAX + GRACE)
+
+        except asyncio.TimeoutError:
+            log.info(f"Worker {worker.process.pid} did not respond in time, replacing it")
+            asyncio.create_task(self._replace(worker))
+            return Result(ExitCode.FAIL_TIMEOUT, f"Timeout: worker killed after {T_MAX + GRACE} seconds")
+
+        except asyncio.CancelledError:
+            # The worker may still be busy with the job, so it can't be reused
+            asyncio.create_task(self._replace(worker))
+            raise
+
+        except (EOFError, ConnectionError) as worker_exc:
+            log.info(f"Worker {worker.process.pid} died, replacing it: {worker_exc}")
+            asyncio.create_task(self._replace(worker))
+            return Result(ExitCode.FAIL_KILLED, "Worker died, likely by exceeding a resource limit")
+
+        self.idle.put_nowait(worker)
+        return result
+
+    def describe(self) -> str:
+        """Format pool state for humans."""
+        return f"Workers: `{len(self.workers)}`, idle: `{self.idle.qsize()}`, replaced: `{self.kills}`"
@@ -0,0 +1,83 @@
+import asyncio
+import io
+import logging
+import time
+import typing as t
+
+import discord
+
+from ryan.exts.execute.output import RingBuffer
+
+log = logging.getLogger(__name__)
+
+DISPLAY_MAX = 1800  # Characters of output shown in an embed, longer output is attached as a file
+EDIT_INTERVAL = 2  # Seconds between edits of a live output message, edits are rate limited per channel
+
+
+def render_output(output: str, dropped: int = 0) -> t.Tuple[str, t.Optional[discord.File]]:
+    """
+    Prepare `output` for an embed, return the text to show & possibly a file to attach.
+
+    If `output` doesn't fit into an embed, only its end is shown, and the whole output is given
+    as a file. The file notes how many characters of `output` were `dropped` before it.
+    """
+    if len(output) <= DISPLAY_MAX and not dropped:
+        return output, None
+
+    header = f"[{dropped:,} characters dropped]\n" if dropped else ""
+    file = discord.File(io.BytesIO((header + output).encode()), filename="output.txt")
+    return f"[Full output attached]\n...{output[-DISPLAY_MAX:]}", file
+
+
+class LiveOutput:
+    """
+    Show output of running code in a message, edited as the output grows.
+
+    Edits are debounced: at most one edit is made per `EDIT_INTERVAL` seconds, and only if
+    there is new output, however fast the code writes. Only the end of the output is shown.
+    """
+
+    def __init__(self, message: discord.Message, feed: RingBuffer) -> None:
+        """Show output written to `feed` in `message`."""
+        self.message = message
+        self.feed = feed
+        self.started = time.monotonic()
+        self.edits = 0
+
+        self._task: t.Optional[asyncio.Task] = None
+
+    def embed(self) -> discord.Embed:
+        """Create embed showing the current end of the output."""
+        elapsed = time.monotonic() - self.started
+        return discord.Embed(
+            description=(
+                f"Running for `{elapsed:,.0f} s`, `{self.feed.written:,}` characters of output so far\n"
+                f"```\n{self.feed.tail(DISPLAY_MAX) or ' '}```"
+            ),
+            colour=discord.Colour.orange(),
+        )
+
+    async def _update(self) -> None:
+        """Edit the message whenever there is new output, but at most once per interval."""
+        shown = 0
+        while True:
+            await asyncio.sleep(EDIT_INTERVAL)
+            if self.feed.written == shown:
+                continue
+
+            shown = self.feed.written
+            try:
+                await self.message.edit(embed=self.embed())
+                self.edits += 1
+            except discord.HTTPException as http_exc:
+                log.warning(f"Failed to edit live output: {http_exc}")
+
+    def start(self) -> None:
+        """Start updating the message."""
+        self._task = asyncio.create_task(self._update())
+
+    def stop(self) -> None:
+        """Stop updating the message."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,209 @@
+import ast
+import asyncio
+import cProfile
+import enum
+import hashlib
+import logging
+import re
+import textwrap
+import time
+import traceback
+import types
+import typing as t
+
+from ryan.exts.execute.output import RingBuffer, capture_stdout
+from ryan.utils import LRUCache
+
+log = logging.getLogger(__name__)
+
+CODEBLOCK_REGEX = re.compile(r"(^```(py(thon)?)?\n)|(```$)")
+INDENT_DEPTH = 4
+
+T_MAX = 30  # Seconds to wait before exec job finishes, raise timeout otherwise
+
+CODE_CACHE_SIZE = 128  # Compiled code objects kept, keyed by source hash
+
+# To allow execution of coroutines, we'll inject the code into this template, which
+# wraps everything in an awaitable body, prepares the coroutine, and assigns it
+ASYNC_WRAP = """
+async def wrap():
+{in_code}
+
+coro = wrap()
+"""
+
+
+# Compiled code is reused when the same text is executed again, e.g. when re-running a snippet while debugging
+code_cache: LRUCache[t.Tuple[bytes, bool], types.CodeType] = LRUCache(CODE_CACHE_SIZE)
+
+
+class ExitCode(enum.Enum):
+    """Flags signaling outcome when executing code."""
+
+    SUCCESS = 0
+    FAIL_COMPILE = 1
+    FAIL_RUNTIME = 2
+    FAIL_TIMEOUT = 3
+    FAIL_KILLED = 4  # Worker process died, e.g. when exceeding a resource limit
+    FAIL_UNAVAILABLE = 5  # No worker was available to run the code
+
+
+def error_message(exc: Exception) -> str:
+    """
+    Turn `exc` into a pretty, succinct error message.
+
+    This only wraps the `traceback` module - sadly its interface is fairly ugly
+    and so we can help ourselves by at least abstracting the ugly away.
+
+    The message does not contain the stack trace, as it's generally not necessary
+    and brings about a certain level of complexity.
+    """
+    error_lines = ["[Traceback ignored]\n\n"] + traceback.format_exception_only(type(exc), exc)
+    return "".join(error_lines)
+
+
+class Result(t.NamedTuple):
+    """Outcome of `run_code`, with the time spent in each phase in seconds."""
+
+    exit_code: ExitCode
+    out_message: str
+    compile_time: float = 0.0
+    run_time: float = 0.0
+    cached: bool = False  # Whether the compiled code came from `code_cache`
+    run_times: t.Tuple[float, ...] = ()  # Time taken by each run, if repeated
+    report: str = ""  # Measurements made during the runs, if requested, see `measure`
+    details: str = ""  # Full measurements, too long to show in a message
+    dropped: int = 0  # Characters of output dropped before `out_message`, see `RingBuffer`
+
+
+def compile_code(in_text: str, session: bool) -> t.Tuple[types.CodeType, bool]:
+    """
+    Extract Python code from `in_text` Markdown codeblock & compile it, or get it from `code_cache`.
+
+    Code for a session is compiled as a module with top-level await allowed, so that names it
+    assigns land in the session namespace. Otherwise, it is wrapped in `ASYNC_WRAP`, which keeps
+    names local to the run, but allows the code to `return` early.
+
+    Return the code & whether it came from the cache. Raise if compilation fails.
+    """
+    key = hashlib.sha256(in_text.encode()).digest(), session
+    if (compiled_code := code_cache.get(key)) is not None:
+        log.debug("Compiled code found in cache")
+        return compiled_code, True
+
+    log.debug(f"Processing received text: {in_text!r}")  # Force repr due to new lines polluting logfile
+    extracted_code = CODEBLOCK_REGEX.sub("", in_text.strip())
+
+    if session:
+        log.debug(f"Attempting to compile with top-level await: {extracted_code!r}")
+        compiled_code = compile(extracted_code, filename="<memory>", mode="exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+    else:
+        log.debug(f"Indenting code by {INDENT_DEPTH} spaces to allow async wrap")
+        wrapped_code = ASYNC_WRAP.format(in_code=textwrap.indent(extracted_code, prefix=" " * INDENT_DEPTH))
+
+        log.debug(f"Attempting to compile: {wrapped_code!r}")
+        compiled_code = compile(wrapped_code, filename="<memory>", mode="exec")
+
+    code_cache.set(key, compiled_code)
+    return compiled_code, False
+
+
+async def execute_once(compiled_code: types.CodeType, in_locals: t.Dict[str, t.Any], session: bool) -> None:
+    """Run `compiled_code` from `compile_code` once, within `in_locals`."""
+    if session:
+        # Top-level code runs right away, and gives a coroutine only if it awaits something
+        if (coro := eval(compiled_code, in_locals)) is not None:
+            await asyncio.wait_for(coro, timeout=T_MAX)
+    else:
+        exec(compiled_code, in_locals)
+        await asyncio.wait_for(in_locals["coro"], timeout=T_MAX)
+
+
+async def run_code(
+    in_text: str,
+    in_locals: t.Dict[str, t.Any],
+    session: bool = False,
+    out_feed: t.Optional[RingBuffer] = None,
+    repeat: int = 1,
+    profiler: t.Optional[cProfile.Profile] = None,
+) -> Result:
+    """
+    Attempt to extract Python code from `in_text` Markdown codeblock, compile & execute it.
+
+    At runtime, the executed codeblock will be given access to `in_locals`, which means that
+    any kind of surrounding context can be passed in. Be careful with this!
+
+    If no locals are to be used, pass an empty mapping. If `session` is True, `in_locals` is
+    a persistent namespace, and names assigned by the code will be stored in it.
+
+    Stdout is captured into `out_feed`, which can be watched by the caller while the code runs.
+    By default, a `RingBuffer` is used, so that a chatty snippet cannot exhaust memory.
+
+    The code can be run `repeat` times, each run is timed separately. If `profiler` is given,
+    it is enabled for the duration of each run. See `measure` for the reports.
+
+    The result holds an ExitCode member flag signaling the outcome, an optional message,
+    and the time taken to compile & run the code.
+
+    We capture stdout at runtime, however, the executed code may not ever write to stdout,
+    in which case the second return value is simply an empty string. In the case of
+    a runtime exception, we return a formatted error message instead of stdout.
+
+    Capture is local to the current context, see `capture_stdout`, so multiple snippets can
+    run concurrently without their output mixing, and the bot's own prints are not captured.
+
+    The task is killed after `T_MAX` seconds if it doesn't finish by then. The limit isn't strict
+    and is mostly in place to prevent an accidental endless loop, which we would otherwise have
+    no way to cancel once it gets awaited.
+    """
+    compile_start = time.perf_counter()
+    try:
+        compiled_code, cached = compile_code(in_text, session)
+
+    # We'll abort & exit early if the code fails to compile, propagating the error message,
+    # which is generally pretty useful as it shows where the parser failed
+    except Exception as compile_exc:
+        log.debug(f"Failed to compile: {compile_exc}")
+        return Result(ExitCode.FAIL_COMPILE, error_message(compile_exc), time.perf_counter() - compile_start)
+
+    compile_time = time.perf_counter() - compile_start
+
+    log.debug("Compiled successfully, executing...")
+    if out_feed is None:
+        out_feed = RingBuffer()
+    run_times: t.List[float] = []
+
+    def result(exit_code: ExitCode, out_message: str, dropped: int = 0) -> Result:
+        return Result(exit_code, out_message, compile_time, sum(run_times), cached, tuple(run_times), dropped=dropped)
+
+    # Attempt to execute our compiled code and capture stdout into `out_feed`
+    try:
+        with capture_stdout(out_feed):
+            for _ in range(repeat):
+                run_start = time.perf_counter()
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    await execute_once(compiled_code, in_locals, session)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                    run_times.append(time.perf_counter() - run_start)
+
+    # We consider timeouts to be a special case with its own exit code, the exception
+    # raised by asyncio doesn't include `T_MAX` so we use our own message
+    except asyncio.TimeoutError as timeout_exc:
+        log.debug(f"Schedule task timed out: {timeout_exc} ({T_MAX=})")
+        return result(ExitCode.FAIL_TIMEOUT, f"Timeout: task killed after {T_MAX} seconds")
+
+    # If anything else goes wrong, we'll propagate the error message as a string
+    except Exception as runtime_exc:
+        log.debug(f"Code failed at runtime: {runtime_exc}")
+        return result(ExitCode.FAIL_RUNTIME, error_message(runtime_exc))
+
+    # Otherwise, we'll retrieve stdout from our feed and return it - note that
+    # we do not expose stdout if something failed, which means that a runtime
+    # exception will hide "override" it, which is probably ok for now
+    else:
+        log.debug("Code executed successfully!")
+        return result(ExitCode.SUCCESS, out_feed.getvalue() or "[No output]", out_feed.dropped)
@@ -0,0 +1,60 @@
+import logging
+import time
+import typing as t
+
+log = logging.getLogger(__name__)
+
+SESSION_IDLE = 15 * 60  # Seconds after which an unused session expires
+
+
+class Session:
+    """Persistent namespace of a REPL-style session, with usage metadata."""
+
+    def __init__(self) -> None:
+        """Create empty session."""
+        self.namespace: t.Dict[str, t.Any] = {}
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.runs = 0
+
+    def touch(self) -> None:
+        """Mark session as used now."""
+        self.last_used = time.monotonic()
+        self.runs += 1
+
+    def idle(self) -> float:
+        """Seconds since the session was last used."""
+        return time.monotonic() - self.last_used
+
+
+class SessionStore:
+    """
+    Sessions by key, e.g. channel ID, expiring after `idle` seconds without use.
+
+    Expired sessions are dropped whenever the store is accessed, so an expired session
+    is never handed out, but may stay in memory until the next access.
+    """
+
+    def __init__(self, idle: float = SESSION_IDLE) -> None:
+        """Prepare empty store."""
+        self.idle = idle
+        self.sessions: t.Dict[int, Session] = {}
+
+    def prune(self) -> None:
+        """Drop expired sessions."""
+        for key in [key for key, session in self.sessions.items() if session.idle() > self.idle]:
+            log.debug(f"Session {key} expired")
+            del self.sessions[key]
+
+    def get(self, key: int) -> Session:
+        """Get session under `key`, creating it if it doesn't exist or has expired."""
+        self.prune()
+        if key not in self.sessions:
+            log.debug(f"Starting session {key}")
+            self.sessions[key] = Session()
+        return self.sessions[key]
+
+    def drop(self, key: int) -> bool:
+        """Drop session under `key`, return whether there was one."""
+        self.prune()
+        return self.sessions.pop(key, None) is not None
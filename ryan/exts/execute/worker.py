@@ -0,0 +1,268 @@
+import asyncio
+import cProfile
+import contextlib
+import io
+import json
+import os
+import pstats
+import re
+import resource
+import statistics
+import sys
+import textwrap
+import time
+import traceback
+import typing as t
+from collections import deque
+
+# This module runs as a standalone script in worker processes, which execute untrusted code, see `WorkerPool`.
+# It must only import the standard library, so that nothing of the bot, e.g. its config & secrets, is ever
+# loaded into a worker. The few helpers it needs are thus copies, keep them in line with the originals.
+
+MEMORY_MAX = 1024 ** 3  # Bytes of address space a worker may use
+CPU_MAX = 30  # Seconds of CPU time a single job may use, the worker is killed by SIGXCPU once exceeded
+OUTPUT_MAX = 64 * 1024  # Characters of output sent back per job or chunk, the rest is dropped
+CHUNK_INTERVAL = 0.5  # Seconds between chunks of streamed output
+
+PROFILE_TOP = 15  # See `measure.PROFILE_TOP`
+DETAILS_MAX = 512 * 1024  # See `measure.DETAILS_MAX`
+
+# Values of `run.ExitCode`
+SUCCESS, FAIL_COMPILE, FAIL_RUNTIME, FAIL_TIMEOUT = 0, 1, 2, 3
+
+# See `run.ASYNC_WRAP`, workers only run code in a fresh namespace
+CODEBLOCK_REGEX = re.compile(r"(^```(py(thon)?)?\n)|(```$)")
+INDENT_DEPTH = 4
+ASYNC_WRAP = """
+async def wrap():
+{in_code}
+
+coro = wrap()
+"""
+
+
+class OutputBuffer(io.TextIOBase):
+    """Text sink keeping only the last `maxlen` characters written to it, see `output.RingBuffer`."""
+
+    def __init__(self, maxlen: int = OUTPUT_MAX) -> None:
+        """Create empty buffer."""
+        self.maxlen = maxlen
+        self.written = 0  # Characters written in total, including dropped ones
+
+        self._chunks: t.Deque[str] = deque()
+        self._size = 0  # Characters currently kept
+
+    def writable(self) -> bool:
+        """Buffer is always writable."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Append `text`, dropping the oldest output if over capacity."""
+        self.written += len(text)
+        self._chunks.append(text)
+        self._size += len(text)
+
+        while self._size > self.maxlen:
+            excess = self._size - self.maxlen
+            oldest = self._chunks[0]
+            if len(oldest) <= excess:
+                self._chunks.popleft()
+                self._size -= len(oldest)
+            else:
+                self._chunks[0] = oldest[excess:]
+                self._size -= excess
+
+        return len(text)
+
+    @property
+    def dropped(self) -> int:
+        """Amount of characters written but no longer kept."""
+        return self.written - self._size
+
+    def getvalue(self) -> str:
+        """Get all kept output."""
+        return "".join(self._chunks)
+
+    def clear(self) -> None:
+        """Drop all kept output, counters are kept."""
+        self._chunks.clear()
+        self._size = 0
+
+
+class ChunkFeed(OutputBuffer):
+    """
+    Stdout sink sending output to the pool in chunks while the code runs.
+
+    Chunks are sent from `write`, at most once per `CHUNK_INTERVAL`, so that output streams
+    even while CPU-bound code keeps the worker's event loop busy. Output written faster than
+    it is sent is dropped, except for the last `OUTPUT_MAX` characters of each chunk.
+    """
+
+    def __init__(self, protocol: t.TextIO) -> None:
+        """Send chunks into `protocol`."""
+        super().__init__()
+        self.protocol = protocol
+        self.sent = 0  # Value of `written` at the last chunk
+        self.next_chunk = time.monotonic() + CHUNK_INTERVAL
+
+    def write(self, text: str) -> int:
+        """Buffer `text` & send a chunk if one is due."""
+        written = super().write(text)
+        if time.monotonic() >= self.next_chunk:
+            self.send()
+        return written
+
+    def send(self) -> None:
+        """Send buffered output as a chunk, along with how much was dropped since the last chunk."""
+        chunk = self.getvalue()
+        if chunk or self.written > self.sent:
+            respond(self.protocol, {"chunk": chunk, "dropped": self.written - self.sent - len(chunk)})
+        self.sent = self.written
+        self.clear()
+        self.next_chunk = time.monotonic() + CHUNK_INTERVAL
+
+
+def error_message(exc: Exception) -> str:
+    """Turn `exc` into a succinct error message, see `run.error_message`."""
+    error_lines = ["[Traceback ignored]\n\n"] + traceback.format_exception_only(type(exc), exc)
+    return "".join(error_lines)
+
+
+def profile_report(profiler: cProfile.Profile) -> t.Tuple[str, str]:
+    """Format `profiler` stats, see `measure.profile_report`."""
+    def render(sort: str, amount: t.Optional[int]) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(amount)
+        return stream.getvalue()
+
+    table = render(pstats.SortKey.TIME, PROFILE_TOP)
+    table = table[table.find("   ncalls"):].rstrip()
+
+    return table, render(pstats.SortKey.CUMULATIVE, None)[:DETAILS_MAX]
+
+
+def timeit_report(run_times: t.Sequence[float]) -> t.Tuple[str, str]:
+    """Summarize `run_times`, see `measure.timeit_report`."""
+    table = (
+        f"runs:   {len(run_times)}\n"
+        f"min:    {min(run_times) * 1000:,.3f} ms\n"
+        f"median: {statistics.median(run_times) * 1000:,.3f} ms\n"
+        f"mean:   {statistics.mean(run_times) * 1000:,.3f} ms\n"
+        f"max:    {max(run_times) * 1000:,.3f} ms"
+    )
+    if len(run_times) > 1:
+        table += f"\nstdev:  {statistics.stdev(run_times) * 1000:,.3f} ms"
+
+    details = "\n".join(f"{i}\t{run_time * 1000:.6f} ms" for i, run_time in enumerate(run_times, start=1))
+    return table, details[:DETAILS_MAX]
+
+
+async def run_job(code: str, out_feed: OutputBuffer, profile: bool, repeat: int, timeout: float) -> t.Dict[str, t.Any]:
+    """
+    Compile & run `code` the way `measure.measure_code` does in-process, return fields of `run.Result`.
+
+    Output is captured process-wide, as a worker runs one job at a time.
+    """
+    compile_start = time.perf_counter()
+    try:
+        extracted_code = CODEBLOCK_REGEX.sub("", code.strip())
+        wrapped_code = ASYNC_WRAP.format(in_code=textwrap.indent(extracted_code, prefix=" " * INDENT_DEPTH))
+        compiled_code = compile(wrapped_code, filename="<memory>", mode="exec")
+    except Exception as compile_exc:
+        return {
+            "exit_code": FAIL_COMPILE,
+            "out_message": error_message(compile_exc),
+            "compile_time": time.perf_counter() - compile_start,
+        }
+
+    compile_time = time.perf_counter() - compile_start
+    profiler = cProfile.Profile() if profile else None
+    run_times: t.List[float] = []
+    namespace: t.Dict[str, t.Any] = {}
+
+    try:
+        with contextlib.redirect_stdout(out_feed):
+            for _ in range(repeat):
+                run_start = time.perf_counter()
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    exec(compiled_code, namespace)
+                    await asyncio.wait_for(namespace["coro"], timeout=timeout)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                    run_times.append(time.perf_counter() - run_start)
+
+    except asyncio.TimeoutError:
+        exit_code, out_message, dropped = FAIL_TIMEOUT, f"Timeout: task killed after {timeout} seconds", 0
+    except Exception as runtime_exc:
+        exit_code, out_message, dropped = FAIL_RUNTIME, error_message(runtime_exc), 0
+    else:
+        exit_code, out_message, dropped = SUCCESS, out_feed.getvalue() or "[No output]", out_feed.dropped
+
+    report = details = ""
+    if profiler is not None:
+        report, details = profile_report(profiler)
+    elif repeat > 1:
+        report, details = timeit_report(run_times)
+
+    return {
+        "exit_code": exit_code,
+        "out_message": out_message,
+        "compile_time": compile_time,
+        "run_time": sum(run_times),
+        "run_times": run_times,
+        "report": report,
+        "details": details,
+        "dropped": dropped,
+    }
+
+
+def cpu_used() -> float:
+    """Seconds of CPU time used by this process so far."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def respond(protocol: t.TextIO, message: t.Dict[str, t.Any]) -> None:
+    """Send `message` into `protocol` as a single line."""
+    protocol.write(json.dumps(message) + "\n")
+    protocol.flush()
+
+
+def main() -> None:
+    """
+    Serve requests from `WorkerPool` until stdin closes.
+
+    Requests are read from stdin & responses written to the original stdout, one JSON object
+    per line. If a request asks for streaming, output is sent in chunks before the response,
+    see `ChunkFeed`. Before serving, the original stdout is moved away from fd 1, so that nothing
+    the executed code prints, even via `os.write`, can corrupt the protocol.
+    """
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="UTF-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_MAX, MEMORY_MAX))
+    loop = asyncio.new_event_loop()
+
+    for line in sys.stdin:
+        request = json.loads(line)
+
+        # The CPU limit is cumulative for the process, so it is moved forward for each job
+        limit = int(cpu_used()) + CPU_MAX
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, resource.RLIM_INFINITY))
+
+        out_feed = ChunkFeed(protocol) if request["stream"] else OutputBuffer()
+        result = loop.run_until_complete(
+            run_job(request["code"], out_feed, request["profile"], request["repeat"], request["timeout"])
+        )
+        if isinstance(out_feed, ChunkFeed):
+            out_feed.send()
+
+        respond(protocol, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -66,6 +66,11 @@ class Extensions(commands.Cog):
 
         await ctx.send(embed=response)
 
+    @ext_group.command(name="routes")
+    async def ext_routes(self, ctx: commands.Context) -> None:
+        """Show message listeners & how much time they take."""
+        await ctx.send(embed=msg_success(self.bot.router.describe()))
+
 
 def setup(bot: Ryan) -> None:
     """Load the Extensions cog."""
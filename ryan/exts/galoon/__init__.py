@@ -0,0 +1,10 @@
+from ryan.bot import Ryan
+from ryan.exts.galoon.cog import Galoon
+from ryan.exts.galoon.outbox import OutboxStore, RelayOutbox
+
+__all__ = ["Galoon", "OutboxStore", "RelayOutbox", "setup"]
+
+
+def setup(bot: Ryan) -> None:
+    """Load Gallonmate cog."""
+    bot.add_cog(Galoon(bot))
@@ -0,0 +1,70 @@
+import logging
+import random
+from pathlib import Path
+
+import discord
+from discord.ext import commands
+
+from ryan.bot import Ryan
+from ryan.config import App, Channels, Emoji, Users
+from ryan.exts.galoon.outbox import Delivery, OutboxStore, RelayOutbox, Undeliverable
+from ryan.utils import relay_message, route
+
+USERS = {Users.gallonmate}  # Users which can be galooned
+
+DATA_DIR = Path(App.data_dir, "galoon")  # Outbox of undelivered relays
+
+log = logging.getLogger(__name__)
+
+
+class Galoon(commands.Cog):
+    """
+    Galoon rolls.
+
+    Successful rolls are archived through an outbox, so that a slow or failing relay neither holds
+    up message handling nor gets lost.
+    """
+
+    def __init__(self, bot: Ryan) -> None:
+        """Initialize cog & start the outbox once the bot is ready."""
+        self.bot = bot
+        self.outbox = RelayOutbox(OutboxStore(DATA_DIR.joinpath("outbox.sqlite3")), self.deliver)
+
+        self.outbox_task = bot.loop.create_task(self.start_outbox())
+
+    def cog_unload(self) -> None:
+        """Stop the outbox, undelivered relays will be resumed when the cog is loaded again."""
+        self.outbox_task.cancel()
+        self.outbox.stop()
+
+    async def start_outbox(self) -> None:
+        """Start delivering relays, channels must be available by then."""
+        await self.bot.wait_until_ready()
+        await self.outbox.start()
+
+    async def deliver(self, delivery: Delivery) -> None:
+        """React to the galooned message & relay it, fetching it first if it was resumed."""
+        message = delivery.message
+        if message is None:
+            if (channel := self.bot.get_channel(delivery.channel_id)) is None:
+                raise Undeliverable(f"Channel {delivery.channel_id} is not available")
+            message = await channel.fetch_message(delivery.message_id)
+
+        if (target := self.bot.get_channel(delivery.target_id)) is None:
+            raise Undeliverable(f"Target channel {delivery.target_id} is not available")
+
+        await message.add_reaction(Emoji.galooned)
+        await relay_message(message, target, self.bot.http_session)
+
+    @route(authors=USERS, channel_types=[discord.ChannelType.text, discord.ChannelType.news])
+    async def roll(self, message: discord.Message) -> None:
+        """
+        Galoon roll in-guild messages from `USERS`.
+
+        Only messages sent in a guild text channel, by one of `USERS`, are routed here.
+        On successful rolls, the message is put into the outbox, to receive a reaction and get archived.
+        """
+        if random.randint(0, 99) != 0:
+            return
+
+        await self.outbox.put(message, Channels.gallonmate_rolls)
@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import typing as t
+from pathlib import Path
+
+import aiohttp
+import discord
+
+log = logging.getLogger(__name__)
+
+CONCURRENCY = 2  # Deliveries in flight at once
+MAX_ATTEMPTS = 5  # Attempts before a delivery is given up
+BACKOFF_BASE = 2  # Seconds before the first retry, doubled with each further attempt
+BACKOFF_MAX = 5 * 60  # Seconds, upper bound of the delay between attempts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class Delivery(t.NamedTuple):
+    """A message waiting to be relayed into `target_id`."""
+
+    id: int
+    channel_id: int
+    message_id: int
+    target_id: int
+    attempts: int = 0  # Failed attempts so far
+    message: t.Optional[discord.Message] = None  # Not persisted, fetched again if missing
+
+    def backoff(self) -> float:
+        """Seconds to wait before the next attempt."""
+        return min(BACKOFF_BASE * 2 ** (self.attempts - 1), BACKOFF_MAX)
+
+
+Deliver = t.Callable[[Delivery], t.Awaitable[None]]  # Performs a delivery, raises on failure
+
+
+class Undeliverable(Exception):
+    """Raised by a `Deliver` callable when a delivery cannot ever succeed."""
+
+
+class OutboxStore:
+    """
+    SQLite store of undelivered relays.
+
+    A delivery is written before it is queued and deleted once it is delivered or given up, so
+    whatever is in the store on startup was interrupted & should be queued again.
+
+    All database work is done in a worker thread, with a short-lived connection per operation.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Prepare store at `path`, the schema is created on first use."""
+        self.path = path
+
+    @contextlib.contextmanager
+    def _connect(self) -> t.Iterator[sqlite3.Connection]:
+        """Open connection & ensure schema exists, commit on success & close on exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _add(self, channel_id: int, message_id: int, target_id: int) -> int:
+        """Write new delivery, return its ID."""
+        with self._connect() as connection:
+            return connection.execute(
+                "INSERT INTO deliveries (channel_id, message_id, target_id) VALUES (?, ?, ?)",
+                (channel_id, message_id, target_id),
+            ).lastrowid
+
+    async def add(self, message: discord.Message, target_id: int) -> Delivery:
+        """Store delivery of `message` into `target_id`."""
+        delivery_id = await asyncio.to_thread(self._add, message.channel.id, message.id, target_id)
+        return Delivery(delivery_id, message.channel.id, message.id, target_id, message=message)
+
+    def _execute(self, query: str, *params: t.Any) -> None:
+        """Execute `query` with `params`."""
+        with self._connect() as connection:
+            connection.execute(query, params)
+
+    async def attempted(self, delivery: Delivery) -> None:
+        """Remember failed attempts of `delivery`."""
+        await asyncio.to_thread(
+            self._execute, "UPDATE deliveries SET attempts = ? WHERE id = ?", delivery.attempts, delivery.id,
+        )
+
+    async def remove(self, delivery: Delivery) -> None:
+        """Forget `delivery`, it was either delivered or given up."""
+        await asyncio.to_thread(self._execute, "DELETE FROM deliveries WHERE id = ?", delivery.id)
+
+    def _undelivered(self) -> t.List[Delivery]:
+        """Read all deliveries."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, channel_id, message_id, target_id, attempts FROM deliveries ORDER BY id",
+            ).fetchall()
+        return [Delivery(*row) for row in rows]
+
+    async def undelivered(self) -> t.List[Delivery]:
+        """Get all deliveries which were not delivered yet, oldest first."""
+        return await asyncio.to_thread(self._undelivered)
+
+
+class RelayOutbox:
+    """
+    Queue of relays delivered in the background, retried with backoff on failure.
+
+    Producers `put` a message & return immediately, while `CONCURRENCY` workers drain the queue
+    using `deliver`. A delivery failing on an HTTP or connection error is retried after an
+    exponentially growing delay, until `MAX_ATTEMPTS` is reached. If the message or the target
+    is gone, or we lack permissions, the delivery is given up straight away.
+
+    Deliveries are persisted in `store` until done, those interrupted by a restart or an extension
+    reload are queued again by `start`.
+    """
+
+    def __init__(self, store: OutboxStore, deliver: Deliver) -> None:
+        """Prepare outbox, no deliveries are made until `start` is called."""
+        self.store = store
+        self.deliver = deliver
+        self.queue: asyncio.Queue[Delivery] = asyncio.Queue()
+        self.pending: t.Set[int] = set()  # IDs of deliveries queued, in flight, or waiting for a retry
+
+        self._tasks: t.Set[asyncio.Task] = set()  # Workers & scheduled retries
+
+    def _spawn(self, coro: t.Awaitable) -> None:
+        """Run `coro` in a task tracked until it ends."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _queue(self, delivery: Delivery) -> None:
+        """Queue `delivery` unless it is already pending, e.g. if put while the store was being read."""
+        if delivery.id not in self.pending:
+            self.pending.add(delivery.id)
+            self.queue.put_nowait(delivery)
+
+    async def start(self) -> None:
+        """Queue undelivered relays from the store & start workers."""
+        for delivery in await self.store.undelivered():
+            log.info(f"Resuming delivery {delivery.id} after {delivery.attempts} failed attempts")
+            self._queue(delivery)
+
+        for _ in range(CONCURRENCY):
+            self._spawn(self._work())
+
+    def stop(self) -> None:
+        """Stop workers & pending retries, undelivered relays remain in the store."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def put(self, message: discord.Message, target_id: int) -> None:
+        """Queue relay of `message` into `target_id`, it is delivered in the background."""
+        self._queue(await self.store.add(message, target_id))
+
+    async def _retry(self, delivery: Delivery) -> None:
+        """Queue `delivery` again after its backoff."""
+        await asyncio.sleep(delivery.backoff())
+        self.queue.put_nowait(delivery)
+
+    async def _attempt(self, delivery: Delivery) -> None:
+        """Attempt `delivery` & decide what to do with it next."""
+        try:
+            await self.deliver(delivery)
+
+        except (Undeliverable, discord.NotFound, discord.Forbidden) as permanent_exc:
+            log.warning(f"Giving up delivery {delivery.id}: {permanent_exc}")
+
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as http_exc:
+            delivery = delivery._replace(attempts=delivery.attempts + 1)
+            if delivery.attempts >= MAX_ATTEMPTS:
+                log.error(f"Giving up delivery {delivery.id} after {delivery.attempts} attempts", exc_info=http_exc)
+            else:
+                log.info(f"Delivery {delivery.id} failed, retrying in {delivery.backoff()} s: {http_exc!r}")
+                await self.store.attempted(delivery)
+                self._spawn(self._retry(delivery))
+                return
+
+        await self.store.remove(delivery)
+        self.pending.discard(delivery.id)
+
+    async def _work(self) -> None:
+        """Make deliveries forever."""
+        while True:
+            delivery = await self.queue.get()
+            try:
+                await self._attempt(delivery)
+            except Exception as delivery_exc:
+                # Unexpected, keep the delivery in the store so that it's attempted again on restart
+                log.error(f"Delivery {delivery.id} failed unexpectedly", exc_info=delivery_exc)
+                self.pending.discard(delivery.id)
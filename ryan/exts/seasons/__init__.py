@@ -0,0 +1,12 @@
+from ryan.bot import Ryan
+from ryan.exts.seasons.batch import BatchEditor
+from ryan.exts.seasons.cog import Seasons
+from ryan.exts.seasons.job import SeasonJob
+from ryan.exts.seasons.plan import Plan, plan_guild
+
+__all__ = ["BatchEditor", "Plan", "SeasonJob", "Seasons", "plan_guild", "setup"]
+
+
+def setup(bot: Ryan) -> None:
+    """Load Seasons cog."""
+    bot.add_cog(Seasons(bot))
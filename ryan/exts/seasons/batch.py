@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import time
+import typing as t
+from collections import Counter, deque
+from enum import Enum
+
+import aiohttp
+import discord
+
+from ryan.utils import RateLimit, observe_rate_limits
+
+log = logging.getLogger(__name__)
+
+CONCURRENCY = 8  # Maximum edits in flight at once, across all routes
+
+# Initial guess of rate limits per route kind as (requests, per seconds), used until the `X-RateLimit-*`
+# headers of a response tell otherwise, see `Bucket.observe`. Routes are keyed by their major parameter,
+# so e.g. every channel has its own bucket, but all members of a guild share one.
+ROUTE_LIMITS: t.Dict[str, t.Tuple[int, float]] = {
+    "guild": (2, 10),
+    "channel": (2, 10 * 60),
+    "member": (10, 10),
+}
+
+
+class Outcome(Enum):
+    """Result of a single edit."""
+
+    SUCCESS = "Success"
+    FORBIDDEN = "Missing permission"
+    GONE = "No longer exists"
+    FAILED = "Failed"
+
+
+class Edit(t.NamedTuple):
+    """
+    A single pending edit.
+
+    The `kind` is one of `ROUTE_LIMITS`, and together with `major` identifies the rate limit bucket.
+    The `call` is invoked when the edit is due, and should perform exactly one API request,
+    apart from possibly fetching its target. The `seq` identifies the edit to its owner.
+    """
+
+    kind: str
+    major: int
+    call: t.Callable[[], t.Awaitable[t.Any]]
+    seq: int = 0
+
+
+class Bucket:
+    """
+    Sliding window allowing at most `limit` requests in any `per` seconds.
+
+    Callers first `reserve` a slot, which spaces out concurrent callers in the order they arrived,
+    without a lock. As waiting for the concurrency limit may push requests out of their slots
+    & bunch them up, each request must also be admitted right before it is sent. Admission
+    checks the window against the times requests were really sent.
+
+    The `limit` & `per` given are only a guess. Each response reports the real state of the bucket
+    in its headers, which is passed to `observe`. Until the reported window resets, admission
+    follows the reported amount of remaining requests. If the guess turns out wrong, it is corrected,
+    and callers waiting for their slot reserve it again.
+    """
+
+    def __init__(self, limit: int, per: float) -> None:
+        """Create an empty bucket."""
+        self.limit = limit
+        self.per = per
+        self.slots: t.Deque[float] = deque(maxlen=limit)  # Most recently reserved times
+        self.sent: t.Deque[float] = deque(maxlen=limit)  # Most recent admitted times
+
+        self.in_flight = 0  # Admitted requests which have not finished yet
+        self.remaining: t.Optional[int] = None  # Requests left until `reset_at`, as last reported
+        self.reset_at = 0.0  # When the reported window resets, in monotonic time
+
+        self._corrected = asyncio.Event()  # Set & replaced whenever `limit` or `per` is corrected
+
+    def observe(self, rate_limit: RateLimit) -> None:
+        """Update the bucket by the reported `rate_limit` of a response to one of its requests."""
+        if rate_limit.method == "GET":  # Fetching the target of an edit is on a different route
+            return
+
+        per = self.per
+        if rate_limit.remaining == rate_limit.limit - 1:  # First request of a window, which thus lasts this long
+            per = rate_limit.reset_after
+
+        # Windows reported by the first request vary slightly, so only a considerable difference is a correction
+        if rate_limit.limit != self.limit or abs(per - self.per) > self.per / 10:
+            log.debug(f"Correcting bucket from {self.limit}/{self.per:.1f}s to {rate_limit.limit}/{per:.1f}s")
+            self.limit, self.per = rate_limit.limit, per
+            self.slots = deque(maxlen=self.limit)  # Reserved again by their waiting callers
+            self.sent = deque(self.sent, maxlen=self.limit)
+            self._corrected.set()
+            self._corrected = asyncio.Event()
+
+        # The request being observed is still in flight, the others may not be counted in the report yet
+        self.remaining = rate_limit.remaining - (self.in_flight - 1)
+        self.reset_at = time.monotonic() + rate_limit.reset_after
+
+    async def reserve(self) -> None:
+        """Reserve the next slot & sleep until it comes, reserving again if the bucket is corrected meanwhile."""
+        while True:
+            now = time.monotonic()
+            slot = now
+            if len(self.slots) == self.limit:
+                slot = max(now, self.slots[0] + self.per)
+
+            self.slots.append(slot)
+            if slot <= now:
+                return
+
+            try:
+                await asyncio.wait_for(self._corrected.wait(), timeout=slot - now)
+            except asyncio.TimeoutError:
+                return
+
+    def admit(self) -> float:
+        """
+        Admit a request now & return zero, or return how many seconds to wait before trying again.
+
+        An admitted request must call `finish` once it is done.
+        """
+        now = time.monotonic()
+        if self.remaining is not None and now < self.reset_at:
+            if self.remaining <= 0:
+                return self.reset_at - now
+            self.remaining -= 1
+        elif len(self.sent) == self.limit and (wait := self.sent[0] + self.per - now) > 0:
+            return wait
+
+        self.sent.append(now)
+        self.in_flight += 1
+        return 0.0
+
+    def finish(self) -> None:
+        """Mark an admitted request as done."""
+        self.in_flight -= 1
+
+
+class BatchEditor:
+    """
+    Run many edits concurrently, while staying within Discord rate limits.
+
+    The library sends requests to each route one at a time, and once a response reports the route's
+    bucket exhausted, holds further requests until it resets. A request held there would still
+    occupy one of the `concurrency` slots though, blocking edits on routes which could progress.
+    Here, each route's bucket is thus paced before its requests are sent, starting from `ROUTE_LIMITS`
+    & following the `X-RateLimit-*` headers of responses once they arrive (see `Bucket`), so that
+    edits on independent routes progress in parallel without flooding the connection.
+
+    A single editor runs a single batch. Progress can be read at any time from another task.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CONCURRENCY,
+        on_done: t.Optional[t.Callable[[Edit, Outcome], None]] = None,
+    ) -> None:
+        """Prepare empty editor, `on_done` is called with each edit as soon as it finishes."""
+        self.on_done = on_done
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.buckets: t.Dict[t.Tuple[str, int], Bucket] = {}
+
+        self.results: t.Dict[str, t.Counter[Outcome]] = {kind: Counter() for kind in ROUTE_LIMITS}
+        self.total = 0
+        self.done = 0
+        self.started: t.Optional[float] = None
+        self.finished: t.Optional[float] = None
+
+    def _bucket(self, edit: Edit) -> Bucket:
+        """Get bucket for the route of `edit`, creating it on first use."""
+        key = edit.kind, edit.major
+        if key not in self.buckets:
+            self.buckets[key] = Bucket(*ROUTE_LIMITS[edit.kind])
+        return self.buckets[key]
+
+    @staticmethod
+    async def _call(edit: Edit) -> Outcome:
+        """Send `edit`, translate exceptions to outcomes."""
+        try:
+            await edit.call()
+        except discord.Forbidden:
+            return Outcome.FORBIDDEN
+        except discord.NotFound:
+            return Outcome.GONE
+        except discord.HTTPException as http_exc:
+            log.warning(f"Edit of {edit.kind} {edit.major} failed: {http_exc}")
+            return Outcome.FAILED
+        except (aiohttp.ClientError, asyncio.TimeoutError) as transport_exc:
+            log.warning(f"Edit of {edit.kind} {edit.major} failed: {transport_exc!r}")
+            return Outcome.FAILED
+        return Outcome.SUCCESS
+
+    async def _run_one(self, edit: Edit) -> None:
+        """Wait for the route to allow another request, then run `edit` & record its outcome."""
+        bucket = self._bucket(edit)
+        await bucket.reserve()
+
+        while True:
+            async with self.semaphore:
+                if not (wait := bucket.admit()):
+                    try:
+                        with observe_rate_limits(bucket.observe):
+                            outcome = await self._call(edit)
+                    finally:
+                        bucket.finish()
+                    break
+            await asyncio.sleep(wait)
+
+        self.results[edit.kind][outcome] += 1
+        self.done += 1
+
+        if self.on_done is not None:
+            self.on_done(edit, outcome)
+
+    async def run(self, edits: t.Iterable[Edit]) -> None:
+        """
+        Run all `edits` & wait for them to finish, the outcomes are kept in `results`.
+
+        If an edit fails unexpectedly or the batch is cancelled, the remaining edits are cancelled
+        & awaited before the exception propagates, so that none keeps running unobserved.
+        """
+        edits = list(edits)
+        self.total = len(edits)
+        self.started = time.monotonic()
+        log.info(f"Running batch of {self.total} edits")
+
+        tasks = [asyncio.create_task(self._run_one(edit)) for edit in edits]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.finished = time.monotonic()
+
+        log.info(f"Batch finished in {self.elapsed():.1f}s ({self.throughput():.2f} edits/s)")
+
+    def elapsed(self) -> float:
+        """Seconds since the batch started, or how long it took if it already finished."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def throughput(self) -> float:
+        """Average edits per second so far."""
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed else 0.0
+
+    def eta(self) -> t.Optional[float]:
+        """Estimated seconds until the batch finishes, None if it cannot be estimated yet."""
+        if not (throughput := self.throughput()):
+            return None
+        return (self.total - self.done) / throughput
+
+    def describe(self) -> str:
+        """Format progress for humans."""
+        eta = self.eta()
+        return (
+            f"Done: `{self.done}/{self.total}` in `{self.elapsed():,.0f} s` ({self.throughput():,.2f} edits/s)\n"
+            f"Remaining: {f'`{eta:,.0f} s`' if eta is not None and self.done < self.total else 'n/a'}"
+        )
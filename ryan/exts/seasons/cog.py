@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import typing as t
+from pathlib import Path
+
+import discord
+from discord.ext import commands
+
+from ryan.bot import Ryan
+from ryan.config import App
+from ryan.exts.seasons.decorate import seasons
+from ryan.exts.seasons.job import SeasonJob
+from ryan.exts.seasons.journal import JobJournal
+from ryan.exts.seasons.plan import KINDS, plan_guild
+from ryan.utils import msg_error, msg_success
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path(App.data_dir, "seasons")  # Journal of season change jobs
+
+
+class Seasons(commands.Cog):
+    """
+    Decorates the server for various seasons.
+
+    The guild name, channel names and member names will be decorated with
+    emoji that are pre-defined for each season.
+    """
+
+    seasons_embed = discord.Embed.from_dict(
+        {
+            "title": "Available seasons",
+            "color": discord.Colour.orange().value,
+            "fields": [
+                {
+                    "name": season,
+                    "value": "".join(e for e in emoji),
+                    "inline": False,
+                }
+                for season, emoji in seasons.items()
+            ],
+        },
+    )
+
+    def __init__(self, bot: Ryan) -> None:
+        self.bot = bot
+        self.journal = JobJournal(DATA_DIR.joinpath("jobs.sqlite3"))
+        self.jobs: t.Dict[int, SeasonJob] = {}  # Running jobs by guild ID
+        self.starting: t.Set[int] = set()  # IDs of guilds whose job is being planned & journaled
+
+        self.resume_task = bot.loop.create_task(self.resume())
+
+    def cog_unload(self) -> None:
+        """
+        Stop running jobs, leaving them unfinished in the journal.
+
+        They will be resumed when the cog is loaded again.
+        """
+        self.resume_task.cancel()
+        for job in self.jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+
+    # region: jobs
+
+    def _start(self, job: SeasonJob) -> None:
+        """Start `job` & keep track of it until it ends."""
+        self.jobs[job.job.guild_id] = job
+
+        def forget(task: asyncio.Task) -> None:
+            if self.jobs.get(job.job.guild_id) is job:
+                del self.jobs[job.job.guild_id]
+            if not task.cancelled() and (exc := task.exception()) is not None:
+                log.error(f"Job {job.job.id} failed", exc_info=exc)
+
+        job.start().add_done_callback(forget)
+
+    async def resume(self) -> None:
+        """Resume jobs interrupted by a restart or an extension reload."""
+        await self.bot.wait_until_ready()
+
+        for stored in await self.journal.unfinished():
+            log.info(f"Resuming job {stored.id} in guild {stored.guild_id}")
+            message = None
+            if stored.message_id is not None and (channel := self.bot.get_channel(stored.channel_id)) is not None:
+                message = channel.get_partial_message(stored.message_id)
+            self._start(SeasonJob(self.bot, self.journal, stored, message))
+
+    # endregion
+    # region: command interface
+
+    @commands.group(invoke_without_command=True)
+    async def season(self, ctx: commands.Context, *, season_name: str = None) -> None:
+        """
+        Attempt to decorate the server.
+
+        Many of the decorations may fail due to missing permissions. The bot handles
+        this and reports how many decorations have failed once done.
+
+        Only objects whose name would actually change are edited, see `Plan`. Edits
+        are run concurrently, throttled per route to stay within rate limits, see
+        `BatchEditor`.
+
+        The change runs in the background as a journaled job, which survives restarts,
+        see `SeasonJob`. This command only starts it & sends the progress message.
+
+        If `season_name` is not provided, or is invalid, an embed containing the
+        available seasons will be returned.
+        """
+        if season_name is None or season_name not in seasons:
+            await ctx.send(embed=self.seasons_embed)
+            return
+
+        if ctx.guild.id in self.jobs or ctx.guild.id in self.starting:
+            await ctx.send(embed=msg_error("A season change is already running, see `season cancel`"))
+            return
+
+        # Claim the guild before the first await, it's released once the job is in `jobs`, or on failure
+        self.starting.add(ctx.guild.id)
+        try:
+            plan = await plan_guild(ctx.guild, season_name)
+            if not plan.changes:
+                await ctx.send(embed=msg_success(f"Already in season `{season_name}`, nothing to change"))
+                return
+
+            stored = await self.journal.create(ctx.guild.id, ctx.channel.id, plan)
+            job = SeasonJob(self.bot, self.journal, stored, message=None)
+
+            job.message = await ctx.send(embed=job.progress_embed())
+            await self.journal.set_message(stored.id, job.message.id)
+
+            self._start(job)
+        finally:
+            self.starting.discard(ctx.guild.id)
+
+    @season.command(name="cancel")
+    async def season_cancel(self, ctx: commands.Context) -> None:
+        """Cancel the season change running in this guild, edits sent so far stay in place."""
+        if (job := self.jobs.get(ctx.guild.id)) is None:
+            if ctx.guild.id in self.starting:
+                await ctx.send(embed=msg_error("The season change is still being planned, try again shortly"))
+            else:
+                await ctx.send(embed=msg_error("No season change is running"))
+            return
+
+        job.cancel()
+        await ctx.send(embed=msg_success("Season change cancelled"))
+
+    @season.command(name="plan")
+    async def season_plan(self, ctx: commands.Context, *, season_name: str = None) -> None:
+        """
+        Show how many edits changing to `season_name` would send, without sending any.
+
+        The emoji drawn in a real change will differ, as they are drawn randomly.
+        """
+        if season_name is None or season_name not in seasons:
+            await ctx.send(embed=self.seasons_embed)
+            return
+
+        plan = await plan_guild(ctx.guild, season_name)
+        counts = plan.counts()
+
+        response = discord.Embed(title=f"Season plan: {season_name}", colour=discord.Colour.orange())
+        for kind, title in KINDS.items():
+            response.add_field(
+                name=title,
+                value=f"Would edit: {counts[kind]}\nUnchanged: {plan.unchanged[kind]}",
+                inline=False,
+            )
+        if plan.changes:
+            examples = "\n".join(f"{change.old} -> {change.new}" for change in plan.changes[:5])
+            response.add_field(name="For example", value=examples, inline=False)
+
+        await ctx.send(embed=response)
+
+    # endregion
@@ -0,0 +1,143 @@
+import itertools
+import random
+import re
+import typing as t
+
+RESET_SEASON = "reset"  # Controls the name of the `reset` season
+
+seasons = {
+    "christmas": (
+        u"\U0001F384",  # tree
+        u"\U0001F385",  # santa
+        u"\U0001F98C",  # deer
+        u"\U0001F381",  # gift
+        u"\U00002744",  # snowflake
+        u"\U00002603",  # snowman
+    ),
+    "easter": (
+        u"\U0001F407",  # bunny
+        u"\U0001F430",  # bunny face
+        u"\U0001F423",  # hatching chick
+        u"\U0001F331",  # seedling
+        u"\U0001F95A",  # egg
+        u"\U0001F36B",  # chocolate
+    ),
+    "valentines": (
+        u"\U0001F36B",  # chocolate
+        u"\U0001F495",  # two hearts
+        u"\U0001F493",  # beating heart
+        u"\U0001F49E",  # revolving hearts
+        u"\U0001F498",  # arrow heart
+        u"\U0001F48B",  # kiss
+    ),
+    "saint patrick": (
+        u"\U0001F49A",  # green heart
+        u"\U0001F340",  # four leaf
+        u"\U0001F91E",  # crossed fingers
+        u"\U0001F37A",  # beer
+        u"\U0001F308",  # rainbow
+        u"\U0001F3A9",  # hat
+    ),
+    RESET_SEASON: (
+        "remove decorations",
+    ),
+}
+
+
+# Characters stripped from names before decorating: all season emoji & variation selectors,
+# which some clients append to emoji. Anything else, including non-ASCII text, is kept.
+DECORATIONS = frozenset(
+    "".join(emoji for season, season_emoji in seasons.items() if season != RESET_SEASON for emoji in season_emoji)
+    + "\uFE0E\uFE0F"
+)
+_STRIP_REGEX = re.compile(f"[{''.join(sorted(DECORATIONS))}]")
+
+# Joins names so that they can be stripped in a single pass, Discord names never contain it
+_SEPARATOR = "\0"
+
+# Ordered pairs of distinct emoji per season, drawn from as (prefix, postfix)
+_PAIRS: t.Dict[str, t.List[t.Tuple[str, str]]] = {
+    season: list(itertools.permutations(season_emoji, 2))
+    for season, season_emoji in seasons.items() if season != RESET_SEASON
+}
+
+
+def strip_name(discord_name: str) -> str:
+    """Remove all `DECORATIONS` from `discord_name`."""
+    return _STRIP_REGEX.sub("", discord_name)
+
+
+def strip_names(discord_names: t.Sequence[str]) -> t.List[str]:
+    """
+    Remove all `DECORATIONS` from each of `discord_names`.
+
+    The names are joined & stripped in a single regex pass, which saves most of the per-call
+    overhead of stripping names one by one. Names containing the separator are handled one
+    by one, but should never occur.
+    """
+    stripped = _STRIP_REGEX.sub("", _SEPARATOR.join(discord_names)).split(_SEPARATOR)
+    if len(stripped) != len(discord_names):
+        return [strip_name(name) for name in discord_names]
+    return stripped
+
+
+def decorate_names(discord_names: t.Sequence[str], season_name: str) -> t.List[str]:
+    """
+    Decorate all `discord_names` with emoji for `season_name` in one pass.
+
+    Each name is stripped of existing decorations, and given a prefix & postfix emoji drawn
+    randomly from the season, such that the two differ. All draws are made in a single call.
+
+    If `season_name` is the reset season, the names are only stripped.
+    """
+    names = strip_names(discord_names)
+
+    if season_name == RESET_SEASON:
+        return names
+
+    pairs = random.choices(_PAIRS[season_name], k=len(names))
+    return [prefix + name + postfix for name, (prefix, postfix) in zip(names, pairs)]
+
+
+def decorate_name(discord_name: str, season_name: str) -> str:
+    """
+    Decorate a given string with emoji for current season.
+
+    The used emoji are drawn randomly from the season given by `season_name`.
+    Strips existing decorations from `discord_name` before decorating.
+
+    If `season_name` is the reset season, the name will not be decorated, but existing
+    decorations will be stripped. See `decorate_names` to decorate many names at once.
+    """
+    return decorate_names((discord_name,), season_name)[0]
+
+
+def is_decorated(discord_name: str, season_name: str) -> bool:
+    """
+    Check whether `discord_name` already carries a decoration of `season_name`.
+
+    That is, whether it could have been produced by `decorate_name` for that season.
+    """
+    if season_name == RESET_SEASON or len(discord_name) < 2:
+        return False
+
+    prefix, name, postfix = discord_name[0], discord_name[1:-1], discord_name[-1]
+    emoji = seasons[season_name]
+
+    return prefix != postfix and prefix in emoji and postfix in emoji and strip_name(name) == name
+
+
+def target_names(discord_names: t.Sequence[str], season_name: str) -> t.List[str]:
+    """
+    Get the names that `discord_names` should have in `season_name`.
+
+    Unlike `decorate_names`, names already decorated for the season are kept as they are,
+    so that applying a season repeatedly is idempotent.
+    """
+    targets = list(discord_names)
+    undecorated = [i for i, name in enumerate(targets) if not is_decorated(name, season_name)]
+
+    for i, name in zip(undecorated, decorate_names([targets[i] for i in undecorated], season_name)):
+        targets[i] = name
+
+    return targets
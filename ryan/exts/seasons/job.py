@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import typing as t
+
+import discord
+
+from ryan.bot import Ryan
+from ryan.exts.seasons.batch import BatchEditor, Edit, Outcome
+from ryan.exts.seasons.journal import Job, JobJournal, JobState, PendingEdit
+from ryan.exts.seasons.plan import KINDS
+
+log = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 10  # Seconds between progress message updates & journal flushes
+
+ProgressMessage = t.Union[discord.Message, discord.PartialMessage]  # Partial when resumed
+
+
+class SeasonJob:
+    """
+    Run a journaled season change in the background, reporting progress in a message.
+
+    Outcomes are buffered & flushed into the journal periodically, so a restart may cause
+    at most `PROGRESS_INTERVAL` seconds worth of edits to be sent again. As the journal holds
+    the planned names, repeated edits don't change the result.
+
+    Cancelling the task of a job leaves it running in the journal, so that it resumes after
+    a restart or an extension reload. To stop the job for good, use `cancel`.
+    """
+
+    def __init__(self, bot: Ryan, journal: JobJournal, job: Job, message: t.Optional[ProgressMessage]) -> None:
+        """Prepare `job`, reporting in `message`, it only starts once `start` is called."""
+        self.bot = bot
+        self.journal = journal
+        self.job = job
+        self.message = message
+
+        self.editor = BatchEditor(on_done=self._on_done)
+        self.resumed = 0  # Edits which were already done before this run
+        self.cancelled = False
+        self.failed = False
+        self.task: t.Optional[asyncio.Task] = None
+
+        self._outcomes: t.List[t.Tuple[int, Outcome]] = []  # Not yet flushed into the journal
+
+    def _on_done(self, edit: Edit, outcome: Outcome) -> None:
+        """Buffer outcome of `edit`."""
+        self._outcomes.append((edit.seq, outcome))
+
+    async def _flush(self) -> None:
+        """Record buffered outcomes into the journal."""
+        outcomes, self._outcomes = self._outcomes, []
+        if outcomes:
+            await self.journal.record(self.job.id, outcomes)
+
+    def _edit(self, guild: discord.Guild, pending: PendingEdit) -> Edit:
+        """Create edit sending `pending`, its target is resolved only once it is due."""
+        if pending.kind == "guild":
+            return Edit("guild", guild.id, lambda: guild.edit(name=pending.name), pending.seq)
+
+        if pending.kind == "channel":
+            async def edit_channel() -> None:
+                channel = guild.get_channel(pending.target_id) or await self.bot.fetch_channel(pending.target_id)
+                await channel.edit(name=pending.name)
+
+            return Edit("channel", pending.target_id, edit_channel, pending.seq)
+
+        async def edit_member() -> None:
+            # Members aren't cached, and fetching each would double the requests, so edit by ID
+            if pending.target_id == guild.me.id:
+                await guild.me.edit(nick=pending.name)
+            else:
+                await self.bot.http.edit_member(guild.id, pending.target_id, nick=pending.name)
+
+        return Edit("member", guild.id, edit_member, pending.seq)
+
+    # region: reporting
+
+    def progress_embed(self) -> discord.Embed:
+        """Create embed showing progress of the current run."""
+        embed = discord.Embed(
+            title=f"Season change in progress: {self.job.season}",
+            description=self.editor.describe(),
+            colour=discord.Colour.orange(),
+        )
+        if self.resumed:
+            embed.set_footer(text=f"Resumed, {self.resumed} edits were done before")
+        return embed
+
+    async def result_embed(self) -> discord.Embed:
+        """Create embed summarizing all recorded outcomes."""
+        summary = await self.journal.summary(self.job.id)
+
+        if self.failed:
+            embed = discord.Embed(title="Season change failed", colour=discord.Colour.red())
+        elif self.cancelled:
+            embed = discord.Embed(title="Season change cancelled", colour=discord.Colour.red())
+        else:
+            embed = discord.Embed(title="Season change completed", colour=discord.Colour.green())
+
+        for kind, title in KINDS.items():
+            results = summary.get(kind, {})
+            lines = [f"{outcome.value}: {results[outcome]}" for outcome in Outcome if results.get(outcome)]
+            if self.job.unchanged[kind]:
+                lines.append(f"Unchanged: {self.job.unchanged[kind]}")
+            embed.add_field(name=title, value="\n".join(lines) or "Nothing to edit", inline=False)
+
+        embed.add_field(
+            name="Duration",
+            value=f"`{self.editor.elapsed():,.0f} s` ({self.editor.throughput():,.2f} edits/s)",
+            inline=False,
+        )
+        return embed
+
+    async def _report(self, embed: discord.Embed, final: bool = False) -> None:
+        """Show `embed` in the progress message, the final report is sent anew if the message is gone."""
+        if self.message is not None:
+            try:
+                await self.message.edit(embed=embed)
+                return
+            except discord.HTTPException as http_exc:
+                log.warning(f"Failed to edit progress message of job {self.job.id}: {http_exc}")
+                self.message = None
+
+        if final and (channel := self.bot.get_channel(self.job.channel_id)) is not None:
+            try:
+                await channel.send(embed=embed)
+            except discord.HTTPException as http_exc:
+                log.warning(f"Failed to send result of job {self.job.id}: {http_exc}")
+
+    # endregion
+    # region: lifecycle
+
+    async def run(self) -> None:
+        """Send all pending edits, reporting progress periodically, then report the result."""
+        guild = self.bot.get_guild(self.job.guild_id)
+        if guild is None:
+            log.warning(f"Guild of job {self.job.id} is not available, giving up")
+            await self.journal.finish(self.job.id, JobState.CANCELLED)
+            return
+
+        batch: t.Optional[asyncio.Task] = None
+        try:
+            pending = await self.journal.pending(self.job.id)
+            summary = await self.journal.summary(self.job.id)
+            self.resumed = sum(sum(results.values()) for results in summary.values())
+            log.info(f"Running job {self.job.id}: {len(pending)} pending edits, {self.resumed} done before")
+
+            batch = asyncio.create_task(self.editor.run(self._edit(guild, edit) for edit in pending))
+            while not batch.done():
+                await asyncio.wait([batch], timeout=PROGRESS_INTERVAL)
+                await self._flush()
+                if not batch.done():
+                    await self._report(self.progress_embed())
+            batch.result()
+
+        except asyncio.CancelledError:
+            if batch is not None:
+                batch.cancel()
+            # The task is going down, there is no guarantee that we could await another flush
+            outcomes, self._outcomes = self._outcomes, []
+            self.journal.record_now(self.job.id, outcomes)
+
+            if not self.cancelled:
+                log.info(f"Job {self.job.id} interrupted, it will resume later")
+                raise
+
+            await self.journal.finish(self.job.id, JobState.CANCELLED)
+            log.info(f"Job {self.job.id} cancelled")
+
+        except Exception as job_exc:
+            # The batch has cancelled its remaining edits, keep what is done & don't resume the rest
+            self.failed = True
+            await self._flush()
+            await self.journal.finish(self.job.id, JobState.FAILED)
+            log.error(f"Job {self.job.id} failed", exc_info=job_exc)
+
+        else:
+            await self.journal.finish(self.job.id, JobState.DONE)
+            log.info(f"Job {self.job.id} completed")
+
+        await self._report(await self.result_embed(), final=True)
+
+    def start(self) -> asyncio.Task:
+        """Start running in the background."""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    def cancel(self) -> None:
+        """Stop the job for good, it will not be resumed."""
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+    # endregion
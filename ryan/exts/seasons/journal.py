@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+import json
+import logging
+import sqlite3
+import typing as t
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+
+from ryan.exts.seasons.batch import Outcome
+from ryan.exts.seasons.plan import Plan
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    season TEXT NOT NULL,
+    unchanged TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edits (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    target_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    outcome TEXT,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class JobState(Enum):
+    """Lifecycle of a job, only running jobs are resumed."""
+
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class Job(t.NamedTuple):
+    """A season change of a single guild, as stored in the journal."""
+
+    id: int
+    guild_id: int
+    channel_id: int  # Where the progress message lives
+    message_id: t.Optional[int]  # The progress message, if it was sent
+    season: str
+    unchanged: t.Counter[str]  # Objects left unchanged by the plan, per kind
+    state: JobState
+
+
+class PendingEdit(t.NamedTuple):
+    """A planned edit which has not been sent yet."""
+
+    seq: int
+    kind: str
+    target_id: int
+    name: str
+
+
+class JobJournal:
+    """
+    SQLite journal of season change jobs & their edits.
+
+    A job is written in full before its first edit is sent, and each edit's outcome is recorded
+    once it is known. A job interrupted by a restart can thus be resumed by sending the edits
+    which have no outcome yet, using the same names as were originally planned.
+
+    All database work is done in a worker thread, with a short-lived connection per operation.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Prepare journal at `path`, the schema is created on first use."""
+        self.path = path
+
+    @contextlib.contextmanager
+    def _connect(self) -> t.Iterator[sqlite3.Connection]:
+        """Open connection & ensure schema exists, commit on success & close on exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _job(row: t.Tuple) -> Job:
+        """Build job from a row of the jobs table."""
+        job_id, guild_id, channel_id, message_id, season, unchanged, state = row
+        return Job(job_id, guild_id, channel_id, message_id, season, Counter(json.loads(unchanged)), JobState(state))
+
+    def _create(self, guild_id: int, channel_id: int, plan: Plan) -> Job:
+        """Write job & all its edits."""
+        unchanged = json.dumps(plan.unchanged)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (guild_id, channel_id, season, unchanged, state) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, channel_id, plan.season_name, unchanged, JobState.RUNNING.value),
+            )
+            job_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO edits (job_id, seq, kind, target_id, name) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, seq, change.kind, change.target_id, change.new)
+                    for seq, change in enumerate(plan.changes)
+                ],
+            )
+
+        return Job(job_id, guild_id, channel_id, None, plan.season_name, plan.unchanged, JobState.RUNNING)
+
+    async def create(self, guild_id: int, channel_id: int, plan: Plan) -> Job:
+        """Journal a new job applying `plan` to guild `guild_id`, reporting in `channel_id`."""
+        job = await asyncio.to_thread(self._create, guild_id, channel_id, plan)
+        log.info(f"Journaled job {job.id} with {len(plan.changes)} edits")
+        return job
+
+    def _update(self, job_id: int, column: str, value: t.Any) -> None:
+        """Set `column` of job `job_id` to `value`."""
+        with self._connect() as connection:
+            connection.execute(f"UPDATE jobs SET {column} = ? WHERE id = ?", (value, job_id))
+
+    async def set_message(self, job_id: int, message_id: int) -> None:
+        """Remember the progress message of job `job_id`."""
+        await asyncio.to_thread(self._update, job_id, "message_id", message_id)
+
+    async def finish(self, job_id: int, state: JobState) -> None:
+        """Move job `job_id` into `state`, after which it will not be resumed."""
+        await asyncio.to_thread(self._update, job_id, "state", state.value)
+
+    def _unfinished(self) -> t.List[Job]:
+        """Read all running jobs."""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT * FROM jobs WHERE state = ?", (JobState.RUNNING.value,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    async def unfinished(self) -> t.List[Job]:
+        """Get all jobs which are still running, e.g. because they were interrupted."""
+        return await asyncio.to_thread(self._unfinished)
+
+    def _pending(self, job_id: int) -> t.List[PendingEdit]:
+        """Read edits of job `job_id` without an outcome, in planned order."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT seq, kind, target_id, name FROM edits WHERE job_id = ? AND outcome IS NULL ORDER BY seq",
+                (job_id,),
+            ).fetchall()
+        return [PendingEdit(*row) for row in rows]
+
+    async def pending(self, job_id: int) -> t.List[PendingEdit]:
+        """Get edits of job `job_id` which have not been sent yet."""
+        return await asyncio.to_thread(self._pending, job_id)
+
+    def record_now(self, job_id: int, outcomes: t.List[t.Tuple[int, Outcome]]) -> None:
+        """
+        Record `outcomes` of edits of job `job_id`, given as pairs of edit seq & outcome.
+
+        This blocks, and should only be used directly when the caller cannot await `record`,
+        e.g. while its task is being cancelled.
+        """
+        with self._connect() as connection:
+            connection.executemany(
+                "UPDATE edits SET outcome = ? WHERE job_id = ? AND seq = ?",
+                [(outcome.name, job_id, seq) for seq, outcome in outcomes],
+            )
+
+    async def record(self, job_id: int, outcomes: t.List[t.Tuple[int, Outcome]]) -> None:
+        """Record `outcomes` of edits of job `job_id`, given as pairs of edit seq & outcome."""
+        await asyncio.to_thread(self.record_now, job_id, outcomes)
+
+    def _summary(self, job_id: int) -> t.Dict[str, t.Counter[Outcome]]:
+        """Count recorded outcomes of job `job_id` per kind."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT kind, outcome, COUNT(*) FROM edits WHERE job_id = ? AND outcome IS NOT NULL "
+                "GROUP BY kind, outcome",
+                (job_id,),
+            ).fetchall()
+
+        summary: t.Dict[str, t.Counter[Outcome]] = {}
+        for kind, outcome, count in rows:
+            summary.setdefault(kind, Counter())[Outcome[outcome]] = count
+        return summary
+
+    async def summary(self, job_id: int) -> t.Dict[str, t.Counter[Outcome]]:
+        """Get amount of recorded outcomes of job `job_id`, per kind."""
+        return await asyncio.to_thread(self._summary, job_id)
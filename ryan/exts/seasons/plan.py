@@ -0,0 +1,100 @@
+import logging
+import typing as t
+from collections import Counter
+
+import discord
+
+from ryan.exts.seasons.decorate import target_names
+
+log = logging.getLogger(__name__)
+
+KINDS = {"guild": "Guild name", "channel": "Channels", "member": "Members"}  # Editable kinds & readable names
+
+MEMBER_PAGE = 1000  # Members planned at once, also the most the API gives per request
+
+
+class Change(t.NamedTuple):
+    """A single planned rename of the `kind` object with `target_id` from `old` to `new`."""
+
+    kind: str
+    target_id: int
+    old: str
+    new: str
+
+
+async def member_pages(guild: discord.Guild, size: int = MEMBER_PAGE) -> t.AsyncIterator[t.List[discord.Member]]:
+    """
+    Iterate members of `guild` in pages of up to `size` members.
+
+    The bot does not keep members in its cache, so unless the guild happens to be chunked,
+    members are fetched from the API page by page. Only the current page is kept in memory,
+    and the fetched members are never cached.
+    """
+    if guild.chunked:
+        members = guild.members
+        for start in range(0, len(members), size):
+            yield members[start:start + size]
+        return
+
+    page: t.List[discord.Member] = []
+    async for member in guild.fetch_members(limit=None):
+        page.append(member)
+        if len(page) == size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+class Plan:
+    """
+    Changes needed to bring a guild into a season, computed without editing anything.
+
+    Every object's target name is diffed against its current name, and only real changes
+    are kept. Objects which already have their target name are counted as unchanged.
+
+    Objects are added in batches, see `plan_guild`. Changes only hold IDs & names,
+    so that a plan for a large guild does not keep its members alive.
+    """
+
+    def __init__(self, season_name: str) -> None:
+        """Prepare empty plan for `season_name`."""
+        self.season_name = season_name
+        self.changes: t.List[Change] = []
+        self.unchanged: t.Counter[str] = Counter()
+
+    def add(self, kind: str, targets: t.Sequence[t.Tuple[int, str]]) -> None:
+        """Plan changes of `kind` objects given as pairs of ID & current name, all in one batch."""
+        names = target_names([name for _, name in targets], self.season_name)
+        for (target_id, old), new in zip(targets, names):
+            if new == old:
+                self.unchanged[kind] += 1
+            else:
+                self.changes.append(Change(kind, target_id, old, new))
+
+    @property
+    def skipped(self) -> int:
+        """Amount of objects which need no change."""
+        return sum(self.unchanged.values())
+
+    def counts(self) -> t.Counter[str]:
+        """Amount of changes per kind."""
+        return Counter(change.kind for change in self.changes)
+
+
+async def plan_guild(guild: discord.Guild, season_name: str) -> Plan:
+    """Plan `season_name` for `guild`, processing its members page by page."""
+    plan = Plan(season_name)
+    plan.add("guild", [(guild.id, guild.name)])
+    plan.add("channel", [(channel.id, channel.name) for channel in guild.channels])
+
+    pages = 0
+    async for page in member_pages(guild):
+        plan.add("member", [(member.id, member.display_name) for member in page])
+        pages += 1
+
+    log.info(
+        f"Planned {len(plan.changes)} changes for season {season_name!r} over {pages} member pages, "
+        f"{plan.skipped} unchanged"
+    )
+    return plan
@@ -1,3 +1,24 @@
+from ryan.utils.cache import LRUCache
+from ryan.utils.embeds import EmbedTemplate
 from ryan.utils.messages import msg_error, msg_success, relay_message
+from ryan.utils.monitor import LoopLagMonitor
+from ryan.utils.ratelimit import RateLimit, TracedHTTPClient, observe_rate_limits, rate_limit_trace
+from ryan.utils.router import MessageFilter, MessageRouter, route
+from ryan.utils.scheduler import RefreshScheduler
 
-__all__ = ["msg_error", "msg_success", "relay_message"]
+__all__ = [
+    "EmbedTemplate",
+    "LRUCache",
+    "LoopLagMonitor",
+    "MessageFilter",
+    "MessageRouter",
+    "RateLimit",
+    "RefreshScheduler",
+    "TracedHTTPClient",
+    "msg_error",
+    "msg_success",
+    "observe_rate_limits",
+    "rate_limit_trace",
+    "relay_message",
+    "route",
+]
@@ -0,0 +1,67 @@
+import logging
+import typing as t
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+K = t.TypeVar("K")
+V = t.TypeVar("V")
+
+
+class LRUCache(t.Generic[K, V]):
+    """
+    Size-bounded mapping evicting the least recently used entry on overflow.
+
+    Hits & misses are counted so that the effectiveness of the cache can be inspected.
+    Counters survive `clear`, which only drops the stored entries.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Prepare an empty cache holding at most `maxsize` entries."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._data: t.OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Amount of currently stored entries."""
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        """Show size & counters."""
+        return f"<LRUCache size={len(self)}/{self.maxsize} hits={self.hits} misses={self.misses}>"
+
+    def get(self, key: K, default: t.Any = None) -> t.Any:
+        """
+        Get value stored under `key`, or `default` if it is not present.
+
+        A hit marks the entry as most recently used.
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store `value` under `key`, evicting the least recently used entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            log.debug(f"Evicted cache entry: {evicted!r}")
+
+    def clear(self) -> None:
+        """Drop all entries, counters are kept."""
+        self._data.clear()
+
+    def ratio(self) -> float:
+        """Fraction of `get` calls that were hits, 0 if there have not been any."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
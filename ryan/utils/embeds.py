@@ -0,0 +1,46 @@
+import typing as t
+
+import discord
+
+
+class EmbedTemplate:
+    """
+    Embed built once & produced by copy-and-fill.
+
+    A template keeps a prebuilt embed in its dictionary form, as given by `discord.Embed.to_dict`,
+    so that whatever went into building it, e.g. choosing & formatting its attributes, is only
+    done once. Producing an embed is then a matter of loading a copy of the dictionary through
+    `discord.Embed.from_dict`, followed by setting the per-call attributes.
+
+    Containers, i.e. the author, footer, images & fields, are copied into each produced embed,
+    so it can be further modified without affecting the template or other embeds.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, embed: discord.Embed) -> None:
+        """Capture attributes of `embed`, it can be modified afterwards without affecting the template."""
+        self._data = self._copy(embed.to_dict())
+
+    @staticmethod
+    def _copy(data: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        """Copy embed `data` deep enough that no container is shared, the values inside are immutable."""
+        copy = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                value = dict(value)
+            elif isinstance(value, list):  # Fields
+                value = [dict(item) for item in value]
+            copy[key] = value
+        return copy
+
+    def fill(self, **attrs: t.Any) -> discord.Embed:
+        """
+        Produce embed from the template, with public `attrs` set on top, e.g. `description`.
+
+        Attributes settable through a method, such as the author, are set on the produced embed.
+        """
+        embed = discord.Embed.from_dict(self._copy(self._data))
+        for name, value in attrs.items():
+            setattr(embed, name, value)
+        return embed
@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import random
 import typing as t
 from datetime import datetime
 
+import aiohttp
 import discord
 
 from ryan.config import Images
+from ryan.utils.embeds import EmbedTemplate
 
 TITLE_SUCCESS = (
     "Good point",
@@ -24,48 +27,91 @@ TITLE_ERROR = (
     "I hold my head",
 )
 
+CHUNK_SIZE = 64 * 1024  # Bytes of a streamed attachment read at once
+
 log = logging.getLogger(__name__)
 
 
+def _message_template(title: str, colour: discord.Colour) -> EmbedTemplate:
+    """Prebuild message embed titled `title`."""
+    embed = discord.Embed(colour=colour)
+    embed.set_author(name=title, icon_url=Images.gm_creepy)
+    return EmbedTemplate(embed)
+
+
+# Message embeds differ only in description, so they are prebuilt for each title
+TEMPLATES_SUCCESS = [_message_template(title, discord.Colour.green()) for title in TITLE_SUCCESS]
+TEMPLATES_ERROR = [_message_template(title, discord.Colour.red()) for title in TITLE_ERROR]
+
+
 def msg_success(message: str) -> discord.Embed:
     """Create a success embed with `message`."""
-    embed = discord.Embed(
-        description=message,
-        colour=discord.Colour.green(),
-    )
-    embed.set_author(name=random.choice(TITLE_SUCCESS), icon_url=Images.gm_creepy)
-    return embed
+    return random.choice(TEMPLATES_SUCCESS).fill(description=message)
 
 
 def msg_error(message: str) -> discord.Embed:
     """Create an error embed with `message`."""
-    embed = discord.Embed(
-        description=message,
-        colour=discord.Colour.red(),
-    )
-    embed.set_author(name=random.choice(TITLE_ERROR), icon_url=Images.gm_creepy)
-    return embed
+    return random.choice(TEMPLATES_ERROR).fill(description=message)
+
+
+class StreamedFile(discord.File):
+    """
+    File streamed from an open HTTP response straight into an upload.
+
+    Unlike `discord.File`, the content is never held in memory as a whole, only the chunk in flight
+    is. In exchange, it can only be read once: if discord.py attempts to send the request again,
+    e.g. after being rate limited, `reset` raises instead.
+    """
 
+    def __init__(self, response: aiohttp.ClientResponse, filename: str, *, spoiler: bool = False) -> None:
+        """Stream body of `response`, uploaded as `filename`."""
+        self.response = response
+        self.fp = response.content.iter_chunked(CHUNK_SIZE)
+        self.filename = filename
+        self.spoiler = spoiler
 
-async def download_file(attachment: discord.Attachment) -> t.Optional[discord.File]:
+    def reset(self, *, seek: t.Union[int, bool] = True) -> None:
+        """Raise if the stream would have to be read again, see class docstring."""
+        if seek:
+            raise discord.ClientException(f"Streamed file {self.filename} cannot be sent again")
+
+    def close(self) -> None:
+        """Release the response."""
+        self.response.release()
+
+
+async def open_attachment(session: aiohttp.ClientSession, attachment: discord.Attachment) -> t.Optional[StreamedFile]:
     """
-    Download & return `attachment` file.
+    Start downloading `attachment` & return it as a file to be streamed into an upload.
 
+    Only the response headers are awaited, the body is read as the file is uploaded.
     If the download fails, the reason is logged and None will be returned.
     """
     log.debug(f"Attempting to download attachment: {attachment.url}")
     try:
-        return await attachment.to_file()
-    except discord.HTTPException as http_exc:
+        response = await session.get(attachment.url)
+        response.raise_for_status()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as http_exc:
         log.warning("Failed to download attachment!", exc_info=http_exc)
+        return None
+
+    return StreamedFile(response, attachment.filename, spoiler=attachment.is_spoiler())
+
 
+def link_attachments(embed: discord.Embed, attachments: t.Iterable[discord.Attachment]) -> None:
+    """Add a field linking each of `attachments` to `embed`."""
+    for attachment in attachments:
+        embed.add_field(name="Attachment", value=f"[{attachment.filename}]({attachment.url})")
 
-async def relay_message(message: discord.Message, target: discord.TextChannel) -> None:
+
+async def relay_message(message: discord.Message, target: discord.TextChannel, session: aiohttp.ClientSession) -> None:
     """
     Relays an embed quoting `message` to the `target` channel.
 
-    If the `message` contains attachments, the first one will be sent with the quotation.
-    User-sent messages do not normally contain multiple attachments, so this case is ignored.
+    Attachments of `message` are streamed from the CDN into the upload using `session`, so they are
+    never held in memory as a whole, and are downloaded in parallel. The first one is displayed
+    in the embed. Attachments which would exceed the upload limit of `target`, or fail to download,
+    are linked instead. If the upload fails, the quotation is sent again with all attachments linked.
     """
     author = message.author  # For short since we'll access this a lot
     log.debug(f"Building quotation embed for message from: {author}")
@@ -79,15 +125,36 @@ async def relay_message(message: discord.Message, target: discord.TextChannel) -
     quote_embed.set_author(name=name, icon_url=author.avatar_url)
     quote_embed.set_footer(text=f"{message.guild.name} | {message.channel.name}")
 
-    if message.attachments:
-        log.debug(f"Relaying first of {len(message.attachments)} attachments")
-        attachment = message.attachments[0]  # We will only relay the first attachment
+    # Attachments are uploaded in a single request, so they must fit the limit together
+    upload_limit, to_stream, to_link = target.guild.filesize_limit, [], []
+    for attachment in message.attachments:
+        if attachment.size <= upload_limit:
+            upload_limit -= attachment.size
+            to_stream.append(attachment)
+        else:
+            to_link.append(attachment)
 
-        if (att_file := await download_file(attachment)) is not None:
-            quote_embed.set_image(url=f"attachment://{attachment.filename}")  # Embed displays the attached file
-    else:
-        log.debug("Message contains no attachments")
-        att_file = None
+    log.debug(f"Relaying {len(message.attachments)} attachments, {len(to_link)} over upload limit")
+    opened = await asyncio.gather(*(open_attachment(session, attachment) for attachment in to_stream))
+
+    files = [file for file in opened if file is not None]
+    to_link.extend(attachment for attachment, file in zip(to_stream, opened) if file is None)
+
+    if files:
+        quote_embed.set_image(url=f"attachment://{files[0].filename}")  # Embed displays the attached file
+    link_attachments(quote_embed, to_link)
 
     log.debug("Dispatching quotation embed")
-    await target.send(embed=quote_embed, file=att_file)
+    try:
+        await target.send(embed=quote_embed, files=files or None)
+    except (discord.HTTPException, discord.ClientException, aiohttp.ClientError) as send_exc:
+        if not files:
+            raise
+        log.warning("Failed to upload attachments, linking them instead", exc_info=send_exc)
+
+        for file in files:
+            file.close()  # The upload may not have reached all of them
+        quote_embed.set_image(url=discord.Embed.Empty)
+        quote_embed.clear_fields()
+        link_attachments(quote_embed, message.attachments)
+        await target.send(embed=quote_embed)
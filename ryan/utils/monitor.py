@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import typing as t
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measure event loop lag by timing how late a periodic sleep wakes up.
+
+    If something blocks the loop, e.g. CPU-heavy work in a coroutine, the sleep overshoots
+    by roughly the time the loop was blocked for. This is the delay that every other task,
+    including the gateway heartbeat, experiences at the same time.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600) -> None:
+        """Sample every `interval` seconds, keeping the last `window` samples."""
+        self.interval = interval
+        self.samples: t.Deque[float] = deque(maxlen=window)
+        self.peak = 0.0  # Highest lag since the last `reset_peak`, in seconds
+
+        self._task: t.Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        """Sample lag forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+
+            self.samples.append(lag)
+            self.peak = max(self.peak, lag)
+
+    def start(self) -> None:
+        """Start sampling, must be called from an async context."""
+        if self._task is None:
+            log.info("Starting event loop lag monitor")
+            self._task = asyncio.create_task(self._sample())
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset_peak(self) -> float:
+        """Reset `peak` & return its previous value."""
+        peak, self.peak = self.peak, 0.0
+        return peak
+
+    def describe(self) -> str:
+        """Format recent lag for humans."""
+        if not self.samples:
+            return "No samples yet"
+
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return (
+            f"Average: `{sum(ordered) / len(ordered) * 1000:,.1f} ms`, p99: `{p99 * 1000:,.1f} ms`, "
+            f"max: `{ordered[-1] * 1000:,.1f} ms` (last {len(ordered)} samples)"
+        )
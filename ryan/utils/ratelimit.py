@@ -0,0 +1,113 @@
+import contextlib
+import logging
+import types
+import typing as t
+from contextvars import ContextVar
+
+import aiohttp
+from discord.errors import HTTPException, LoginFailure
+from discord.gateway import DiscordClientWebSocketResponse
+from discord.http import HTTPClient, Route
+
+log = logging.getLogger(__name__)
+
+
+class RateLimit(t.NamedTuple):
+    """Rate limit state of a route, as reported by the `X-RateLimit-*` headers of a response."""
+
+    method: str  # Of the request the response belongs to
+    limit: int  # Requests allowed per window
+    remaining: int  # Requests left in the current window
+    reset_after: float  # Seconds until the window resets
+    bucket: t.Optional[str]  # Hash identifying the bucket, routes may share one
+
+    @classmethod
+    def from_headers(cls, method: str, headers: t.Mapping[str, str]) -> t.Optional["RateLimit"]:
+        """Parse rate limit headers, None if they are missing or malformed."""
+        try:
+            return cls(
+                method,
+                int(headers["X-RateLimit-Limit"]),
+                int(headers["X-RateLimit-Remaining"]),
+                float(headers["X-RateLimit-Reset-After"]),
+                headers.get("X-RateLimit-Bucket"),
+            )
+        except (KeyError, ValueError):
+            return None
+
+
+RateLimitObserver = t.Callable[[RateLimit], None]
+
+# Receives rate limits of responses to requests made in the current context
+_observer: ContextVar[t.Optional[RateLimitObserver]] = ContextVar("rate_limit_observer", default=None)
+
+
+@contextlib.contextmanager
+def observe_rate_limits(observer: RateLimitObserver) -> t.Iterator[None]:
+    """
+    Pass rate limits of responses to Discord requests made in the current context to `observer`.
+
+    This includes requests made by tasks created in the context. Requests which discord.py
+    retries, e.g. after a 429, are observed once per response.
+    """
+    token = _observer.set(observer)
+    try:
+        yield
+    finally:
+        _observer.reset(token)
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession, context: types.SimpleNamespace, params: aiohttp.TraceRequestEndParams,
+) -> None:
+    """Pass rate limit of the response to the observer of the current context, if there is one."""
+    if (observer := _observer.get()) is None:
+        return
+
+    if (rate_limit := RateLimit.from_headers(params.method, params.response.headers)) is not None:
+        observer(rate_limit)
+
+
+def rate_limit_trace() -> aiohttp.TraceConfig:
+    """Create trace config feeding `observe_rate_limits`."""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(_on_request_end)
+    trace.freeze()
+    return trace
+
+
+class TracedHTTPClient(HTTPClient):
+    """
+    HTTP client of discord.py whose sessions trace rate limits, see `observe_rate_limits`.
+
+    discord.py doesn't expose response headers, and only takes the connector of its session
+    from the outside. The session is created anew on login & whenever it is recreated after
+    being closed, so both create it here with the trace installed.
+    """
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create session the same way discord.py does, with the rate limit trace."""
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            ws_response_class=DiscordClientWebSocketResponse,
+            trace_configs=[rate_limit_trace()],
+        )
+
+    def recreate(self) -> None:
+        """Create new session if the current one was closed."""
+        if self._HTTPClient__session.closed:
+            self._HTTPClient__session = self._create_session()
+
+    async def static_login(self, token: str, *, bot: bool) -> t.Dict[str, t.Any]:
+        """Create session & log in with `token`."""
+        self._HTTPClient__session = self._create_session()
+        old_token, old_bot = self.token, self.bot_token
+        self._token(token, bot=bot)
+
+        try:
+            return await self.request(Route("GET", "/users/@me"))
+        except HTTPException as exc:
+            self._token(old_token, bot=old_bot)
+            if exc.response.status == 401:
+                raise LoginFailure("Improper token has been passed.") from exc
+            raise
@@ -0,0 +1,193 @@
+import asyncio
+import inspect
+import logging
+import time
+import typing as t
+
+import discord
+
+log = logging.getLogger(__name__)
+
+MessageCallback = t.Callable[[discord.Message], t.Awaitable[None]]
+
+ROUTE_ATTR = "__message_route__"  # Attribute under which `route` marks cog methods
+
+
+class MessageFilter(t.NamedTuple):
+    """
+    Cheap predicates a message must pass to reach a listener.
+
+    Each field is a set of allowed values, or None to allow any. A message in a DM has no guild,
+    and thus never passes a guild filter.
+    """
+
+    authors: t.Optional[t.FrozenSet[int]] = None
+    channels: t.Optional[t.FrozenSet[int]] = None
+    guilds: t.Optional[t.FrozenSet[int]] = None
+    channel_types: t.Optional[t.FrozenSet[discord.ChannelType]] = None
+
+    def matches(self, message: discord.Message) -> bool:
+        """True if `message` passes all predicates."""
+        if self.authors is not None and message.author.id not in self.authors:
+            return False
+        if self.channels is not None and message.channel.id not in self.channels:
+            return False
+        if self.guilds is not None and (message.guild is None or message.guild.id not in self.guilds):
+            return False
+        if self.channel_types is not None and message.channel.type not in self.channel_types:
+            return False
+        return True
+
+
+def route(
+    *,
+    authors: t.Optional[t.Iterable[int]] = None,
+    channels: t.Optional[t.Iterable[int]] = None,
+    guilds: t.Optional[t.Iterable[int]] = None,
+    channel_types: t.Optional[t.Iterable[discord.ChannelType]] = None,
+) -> t.Callable[[t.Callable], t.Callable]:
+    """
+    Mark cog method as a message listener, routed only messages passing the given predicates.
+
+    Marked methods are registered with the router when their cog is added to the bot,
+    and unregistered when it is removed, see `MessageRouter.add_cog`.
+    """
+    def freeze(values: t.Optional[t.Iterable]) -> t.Optional[frozenset]:
+        return None if values is None else frozenset(values)
+
+    message_filter = MessageFilter(freeze(authors), freeze(channels), freeze(guilds), freeze(channel_types))
+
+    def decorator(func: t.Callable) -> t.Callable:
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"Message listener {func.__qualname__} must be a coroutine function")
+        setattr(func, ROUTE_ATTR, message_filter)
+        return func
+
+    return decorator
+
+
+class Listener:
+    """A routed message listener with usage statistics."""
+
+    def __init__(self, name: str, callback: MessageCallback, message_filter: MessageFilter) -> None:
+        """Wrap `callback` receiving messages passing `message_filter`."""
+        self.name = name
+        self.callback = callback
+        self.filter = message_filter
+
+        self.calls = 0
+        self.errors = 0
+        self.elapsed = 0.0  # Seconds spent in the callback in total, including awaits
+
+    async def __call__(self, message: discord.Message) -> None:
+        """Invoke callback with `message`, errors are logged & counted."""
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            await self.callback(message)
+        except Exception as listener_exc:
+            self.errors += 1
+            log.error(f"Message listener {self.name} failed", exc_info=listener_exc)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+class MessageRouter:
+    """
+    Dispatch messages only to listeners whose filter they pass.
+
+    Each listener is indexed under a single value of its most selective predicate, in order:
+    author, channel, guild & channel type. A message thus only looks up its own author, channel,
+    guild & channel type in the indices, and checks the full filter of the few listeners found.
+    Listeners without any predicates receive all messages.
+
+    Listeners run concurrently, each message is dispatched in its own task by discord.py.
+    """
+
+    def __init__(self) -> None:
+        """Prepare empty router."""
+        self.listeners: t.List[Listener] = []
+        self.seen = 0  # Messages dispatched so far, whether they reached a listener or not
+
+        self._by_author: t.Dict[int, t.List[Listener]] = {}
+        self._by_channel: t.Dict[int, t.List[Listener]] = {}
+        self._by_guild: t.Dict[int, t.List[Listener]] = {}
+        self._by_type: t.Dict[discord.ChannelType, t.List[Listener]] = {}
+        self._unfiltered: t.List[Listener] = []
+
+    def _reindex(self) -> None:
+        """Rebuild indices from `listeners`."""
+        for index in (self._by_author, self._by_channel, self._by_guild, self._by_type):
+            index.clear()
+        self._unfiltered.clear()
+
+        for listener in self.listeners:
+            message_filter = listener.filter
+            for values, index in (
+                (message_filter.authors, self._by_author),
+                (message_filter.channels, self._by_channel),
+                (message_filter.guilds, self._by_guild),
+                (message_filter.channel_types, self._by_type),
+            ):
+                if values is not None:
+                    for value in values:
+                        index.setdefault(value, []).append(listener)
+                    break
+            else:
+                self._unfiltered.append(listener)
+
+    def add(self, name: str, callback: MessageCallback, message_filter: MessageFilter = MessageFilter()) -> None:
+        """Register `callback` under `name` to receive messages passing `message_filter`."""
+        log.debug(f"Routing messages to {name}: {message_filter}")
+        self.listeners.append(Listener(name, callback, message_filter))
+        self._reindex()
+
+    def add_cog(self, cog: object) -> None:
+        """Register all methods of `cog` marked by `route`."""
+        for name, method in inspect.getmembers(cog, inspect.ismethod):
+            message_filter = getattr(method, ROUTE_ATTR, None)
+            if message_filter is not None:
+                self.add(f"{type(cog).__name__}.{name}", method, message_filter)
+
+    def remove_cog(self, cog: object) -> None:
+        """Unregister all listeners bound to `cog`."""
+        self.listeners = [
+            listener for listener in self.listeners
+            if getattr(listener.callback, "__self__", None) is not cog
+        ]
+        self._reindex()
+
+    def match(self, message: discord.Message) -> t.List[Listener]:
+        """Get listeners whose filter `message` passes."""
+        candidates = [
+            *self._by_author.get(message.author.id, ()),
+            *self._by_channel.get(message.channel.id, ()),
+            *self._by_type.get(message.channel.type, ()),
+            *self._unfiltered,
+        ]
+        if message.guild is not None:
+            candidates.extend(self._by_guild.get(message.guild.id, ()))
+
+        # Each listener is indexed once, so there are no duplicates
+        return [listener for listener in candidates if listener.filter.matches(message)]
+
+    async def dispatch(self, message: discord.Message) -> None:
+        """Pass `message` to all listeners whose filter it passes."""
+        self.seen += 1
+        listeners = self.match(message)
+        if listeners:
+            await asyncio.gather(*(listener(message) for listener in listeners))
+
+    def describe(self) -> str:
+        """Format listeners & their statistics for humans."""
+        if not self.listeners:
+            return f"No listeners, `{self.seen:,}` messages seen"
+
+        lines = [f"`{self.seen:,}` messages seen"]
+        for listener in self.listeners:
+            average = listener.elapsed / listener.calls * 1000 if listener.calls else 0.0
+            lines.append(
+                f"{listener.name}: `{listener.calls:,}` calls, `{listener.errors:,}` errors, "
+                f"`{listener.elapsed:,.2f} s` total, `{average:,.1f} ms` average"
+            )
+        return "\n".join(lines)
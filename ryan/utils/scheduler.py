@@ -0,0 +1,191 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+import typing as t
+from datetime import datetime, timedelta
+
+log = logging.getLogger(__name__)
+
+Job = t.Callable[[], t.Awaitable[bool]]  # Returns True on success
+
+
+class RefreshScheduler:
+    """
+    Periodically run a refresh job, with single-flight semantics & backoff on failure.
+
+    At most one run of the job is in flight at any time. Triggering while a run is in flight
+    does not start another run, the caller simply awaits the result of the current one.
+
+    After a successful run, the next one is scheduled after `interval` seconds. After a failed
+    run, the delay grows exponentially from `backoff_base` up to `backoff_max` seconds. Both
+    delays are randomly jittered by up to `jitter` (a fraction), so that restarts or failures
+    don't synchronize requests with other clients.
+
+    Callers serving data produced by the job can call `revalidate` when they notice that the data
+    is older than they would like - a background run is started, unless one is already in flight
+    or the scheduler is backing off. The stale data can be served meanwhile.
+    """
+
+    def __init__(
+        self,
+        job: Job,
+        interval: float,
+        backoff_base: float = 30,
+        backoff_max: float = 30 * 60,
+        jitter: float = 0.1,
+    ) -> None:
+        """Prepare scheduler for `job`, the periodic loop only runs once `start` is called."""
+        self.job = job
+        self.interval = interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+        self.runs = 0  # Total runs, successful or not
+        self.failures = 0  # Consecutive failed runs, reset on success
+        self.coalesced = 0  # Triggers which joined a run already in flight
+        self.last_duration: t.Optional[float] = None  # Seconds taken by the last run
+        self.total_duration = 0.0  # Seconds taken by all runs
+        self.last_success: t.Optional[datetime] = None  # When the last successful run finished
+
+        self._inflight: t.Optional[asyncio.Task] = None
+        self._next_due = 0.0  # Monotonic time at which the next periodic run is due, now by default
+        self._wake = asyncio.Event()  # Set whenever `_next_due` changes
+        self._loop_task: t.Optional[asyncio.Task] = None
+
+    # region: scheduling
+
+    def _delay(self) -> float:
+        """Compute delay until next run, based on the outcome of the last run."""
+        if self.failures:
+            delay = min(self.backoff_base * 2 ** (self.failures - 1), self.backoff_max)
+        else:
+            delay = self.interval
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _run(self, job: Job) -> bool:
+        """Run `job` once, record metrics & plan the next run."""
+        start = time.perf_counter()
+        try:
+            success = await job()
+        except Exception as job_exc:
+            log.exception("Refresh job raised", exc_info=job_exc)
+            success = False
+
+        self.last_duration = time.perf_counter() - start
+        self.total_duration += self.last_duration
+        self.runs += 1
+
+        if success:
+            self.failures = 0
+            self.last_success = datetime.utcnow()
+        else:
+            self.failures += 1
+
+        delay = self._delay()
+        log.info(f"Refresh {'succeeded' if success else 'failed'} in {self.last_duration:.3f}s, next in {delay:.0f}s")
+
+        self._next_due = time.monotonic() + delay
+        self._wake.set()
+        return success
+
+    def _launch(self, job: Job) -> asyncio.Task:
+        """Start a new run of `job`, there must not be one in flight."""
+        task = asyncio.create_task(self._run(job))
+        task.add_done_callback(self._land)
+        self._inflight = task
+        return task
+
+    def _land(self, task: asyncio.Task) -> None:
+        """Forget the landed run, unless another one already took its place."""
+        if self._inflight is task:
+            self._inflight = None
+
+    async def trigger(self, job: t.Optional[Job] = None) -> bool:
+        """
+        Run the refresh job now, or join the run in flight, and return whether it succeeded.
+
+        A different `job` can be given for a one-off run, e.g. with other arguments. Such a run
+        never joins another, it waits for the run in flight to land and then starts its own.
+
+        Cancelling the caller does not cancel the run, as other callers may be waiting for it.
+        """
+        if job is None:
+            if self._inflight is not None:
+                self.coalesced += 1
+                return await asyncio.shield(self._inflight)
+            return await asyncio.shield(self._launch(self.job))
+
+        while self._inflight is not None:
+            with contextlib.suppress(Exception):
+                await asyncio.shield(self._inflight)
+
+        return await asyncio.shield(self._launch(job))
+
+    def revalidate(self) -> None:
+        """Start a background run, unless one is in flight or we're backing off after failures."""
+        if self._inflight is not None:
+            return
+
+        if self.failures and time.monotonic() < self._next_due:
+            log.debug("Not revalidating, backing off after failures")
+            return
+
+        log.debug("Revalidating in the background")
+        self._launch(self.job)
+
+    async def _periodic(self) -> None:
+        """Trigger runs whenever they are due, re-planning whenever a run lands."""
+        while True:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, self._next_due - time.monotonic()))
+            except asyncio.TimeoutError:
+                await self.trigger()
+
+    def start(self) -> None:
+        """Start the periodic loop, the first run is due immediately."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.get_event_loop().create_task(self._periodic())
+
+    def stop(self) -> None:
+        """Stop the periodic loop & cancel the run in flight, if any."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+
+        if self._inflight is not None:
+            self._inflight.cancel()
+
+    # endregion
+    # region: metrics
+
+    def staleness(self) -> t.Optional[timedelta]:
+        """Time since the last successful run, None if there hasn't been one."""
+        if self.last_success is None:
+            return None
+        return datetime.utcnow() - self.last_success
+
+    def next_run(self) -> float:
+        """Seconds until the next periodic run is due, zero if overdue."""
+        return max(0.0, self._next_due - time.monotonic())
+
+    def describe(self) -> str:
+        """Format metrics for humans."""
+        if (staleness := self.staleness()) is not None:
+            last = f"`{staleness.total_seconds() / 60:,.0f} min` ago"
+        else:
+            last = "never"
+
+        average = self.total_duration / self.runs if self.runs else 0.0
+        duration = f"`{self.last_duration * 1000:,.0f} ms`" if self.last_duration is not None else "n/a"
+
+        return (
+            f"Last success: {last}, next run in `{self.next_run() / 60:,.0f} min`\n"
+            f"Last run took: {duration} (average `{average * 1000:,.0f} ms` over `{self.runs}` runs)\n"
+            f"Consecutive failures: `{self.failures}`, coalesced triggers: `{self.coalesced}`"
+        )
+
+    # endregion
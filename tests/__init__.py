@@ -0,0 +1,4 @@
+import os
+
+# Config is loaded on import of `ryan`, which requires the token to be set, but tests never log in
+os.environ.setdefault("BOT_TOKEN", "test")
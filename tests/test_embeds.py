@@ -0,0 +1,59 @@
+import unittest
+from datetime import datetime
+
+import discord
+
+from ryan.utils import EmbedTemplate
+
+
+def build(**attrs: str) -> discord.Embed:
+    """Build a rich embed through the public API, with `attrs` passed to the constructor."""
+    embed = discord.Embed(title="Title", url="https://example.com", colour=discord.Colour.green(), **attrs)
+    embed.timestamp = datetime(2020, 4, 1, 12, 30)
+    embed.set_author(name="Author", icon_url="https://example.com/author.png")
+    embed.set_footer(text="Footer")
+    embed.set_thumbnail(url="https://example.com/thumbnail.png")
+    embed.set_image(url="https://example.com/image.png")
+    embed.add_field(name="First", value="1")
+    embed.add_field(name="Second", value="2", inline=False)
+    return embed
+
+
+class EmbedTemplateTests(unittest.TestCase):
+    """Embeds produced by `EmbedTemplate` must be the same as those built directly."""
+
+    def test_fill_equals_built(self) -> None:
+        """A filled template equals an embed built directly with the same attributes."""
+        template = EmbedTemplate(build())
+        self.assertEqual(template.fill().to_dict(), build().to_dict())
+        self.assertEqual(template.fill(description="Filled").to_dict(), build(description="Filled").to_dict())
+
+    def test_fill_empty(self) -> None:
+        """A template of an empty embed produces an empty embed."""
+        self.assertEqual(EmbedTemplate(discord.Embed()).fill().to_dict(), discord.Embed().to_dict())
+
+    def test_fill_independent(self) -> None:
+        """Modifying a produced embed affects neither the template nor other produced embeds."""
+        template = EmbedTemplate(build())
+
+        embed = template.fill(title="Changed")
+        embed.set_footer(text="Changed")
+        embed.set_field_at(0, name="Changed", value="Changed")
+        embed.add_field(name="Third", value="3")
+        embed.set_author(name="Changed")
+
+        self.assertEqual(template.fill().to_dict(), build().to_dict())
+
+    def test_source_independent(self) -> None:
+        """Modifying the embed a template was made from does not affect the template."""
+        source = build()
+        template = EmbedTemplate(source)
+
+        source.set_footer(text="Changed")
+        source.add_field(name="Third", value="3")
+
+        self.assertEqual(template.fill().to_dict(), build().to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
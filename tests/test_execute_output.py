@@ -0,0 +1,81 @@
+import asyncio
+import contextlib
+import io
+import unittest
+
+from ryan.exts.execute import ExitCode, run_code
+
+JOBS = 40  # Concurrent exec jobs per test
+LINES = 20  # Lines printed by each job, with an await between each two
+
+SNIPPET = """
+import asyncio
+
+for line in range({lines}):
+    print("job {job}", line)
+    await asyncio.sleep(0)
+
+async def child():
+    print("child of job {job}")
+
+await asyncio.create_task(child())
+"""
+
+
+def expected_output(job: int) -> str:
+    """Output of `SNIPPET` run as `job`."""
+    return "".join(f"job {job} {line}\n" for line in range(LINES)) + f"child of job {job}\n"
+
+
+class ConcurrentCaptureTests(unittest.IsolatedAsyncioTestCase):
+    """Output of concurrent `run_code` jobs must not mix, see `capture_stdout`."""
+
+    async def run_jobs(self, session: bool) -> None:
+        """Run `JOBS` jobs concurrently beside a task printing to stdout, assert all output is isolated."""
+        stop = asyncio.Event()
+
+        async def bystander() -> int:
+            printed = 0
+            while not stop.is_set():
+                print("bystander")
+                printed += 1
+                await asyncio.sleep(0)
+            return printed
+
+        # Stands in for the real stdout, the capture proxy is installed on top of it
+        with contextlib.redirect_stdout(io.StringIO()) as real_stdout:
+            bystander_task = asyncio.create_task(bystander())
+            results = await asyncio.gather(*(
+                run_code(SNIPPET.format(lines=LINES, job=job), {}, session=session) for job in range(JOBS)
+            ))
+            stop.set()
+            printed = await bystander_task
+
+        for job, result in enumerate(results):
+            with self.subTest(job=job):
+                self.assertIs(result.exit_code, ExitCode.SUCCESS, result.out_message)
+                self.assertEqual(result.out_message, expected_output(job))
+
+        self.assertGreater(printed, 0)
+        self.assertEqual(real_stdout.getvalue(), "bystander\n" * printed)
+
+    async def test_jobs_isolated(self) -> None:
+        """Jobs run in fresh namespaces get exactly their own output."""
+        await self.run_jobs(session=False)
+
+    async def test_session_jobs_isolated(self) -> None:
+        """Jobs run in session mode, i.e. with top-level await, get exactly their own output."""
+        await self.run_jobs(session=True)
+
+    async def test_nested_capture_restored(self) -> None:
+        """Output after a job finishes goes to the stdout in place before it."""
+        with contextlib.redirect_stdout(io.StringIO()) as real_stdout:
+            result = await run_code('print("inside")', {})
+            print("outside")
+
+        self.assertEqual(result.out_message, "inside\n")
+        self.assertEqual(real_stdout.getvalue(), "outside\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import typing as t
+import unittest
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from discord.http import Route
+
+from ryan.exts.seasons.batch import BatchEditor, Edit, Outcome, ROUTE_LIMITS
+from ryan.utils import RateLimit, TracedHTTPClient, observe_rate_limits, rate_limit_trace
+
+LIMIT = 4  # Requests allowed by the fake API per window of each route
+PER = 0.5  # Seconds, length of the window
+EDITS = 24  # Edits per test, must take several windows
+
+
+class FakeAPI:
+    """
+    Server enforcing rate limits the way Discord does, reporting them in `X-RateLimit-*` headers.
+
+    A window starts with the first request to a route & lasts `PER` seconds, requests over
+    `LIMIT` within it are rejected with a 429. Requests to `/users/@me` are not limited.
+    """
+
+    def __init__(self) -> None:
+        """Prepare server, it is started by the test."""
+        self.windows: t.Dict[str, t.Tuple[float, int]] = {}  # Route to start of its window & requests in it
+        self.accepted = 0
+        self.rejected = 0
+
+        app = web.Application()
+        app.router.add_get("/users/@me", self.me)
+        app.router.add_route("*", "/{route:.*}", self.edit)
+        self.server = TestServer(app)
+
+    def url(self, path: str = "") -> str:
+        """Get URL of `path` on the server."""
+        return str(self.server.make_url(path))
+
+    async def me(self, request: web.Request) -> web.Response:
+        """Respond as the bot user."""
+        return web.json_response({"id": "1", "username": "ryan", "discriminator": "0000", "avatar": None})
+
+    async def edit(self, request: web.Request) -> web.Response:
+        """Accept request unless its route is over the limit."""
+        now = time.monotonic()
+        start, count = self.windows.get(request.path, (now, 0))
+        if now >= start + PER:
+            start, count = now, 0
+
+        reset_after = start + PER - now
+        if count >= LIMIT:
+            self.rejected += 1
+            headers = self.headers(0, reset_after, request.path)
+            return web.json_response({"retry_after": reset_after, "global": False}, status=429, headers=headers)
+
+        self.windows[request.path] = start, count + 1
+        self.accepted += 1
+        return web.json_response({}, headers=self.headers(LIMIT - count - 1, reset_after, request.path))
+
+    @staticmethod
+    def headers(remaining: int, reset_after: float, bucket: str) -> t.Dict[str, str]:
+        """Create rate limit headers."""
+        return {
+            "X-RateLimit-Limit": str(LIMIT),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": bucket,
+        }
+
+
+class BatchRateLimitTests(unittest.IsolatedAsyncioTestCase):
+    """`BatchEditor` must pace edits by the reported rate limits, so that none is ever rejected."""
+
+    async def asyncSetUp(self) -> None:
+        """Start fake API."""
+        self.api = FakeAPI()
+        await self.api.server.start_server()
+        self.addAsyncCleanup(self.api.server.close)
+
+    async def run_batch(self, edits: t.List[Edit]) -> BatchEditor:
+        """Run `edits`, failing if they take much longer than the fake limits require."""
+        editor = BatchEditor()
+        # The initial guess of the guild route is far slower, so this only passes if it is corrected
+        await asyncio.wait_for(editor.run(edits), timeout=EDITS / LIMIT * PER * 4)
+        return editor
+
+    async def test_session_paced(self) -> None:
+        """Edits sent concurrently through a traced session, without any pacing of its own, are never rejected."""
+        guess_limit, guess_per = ROUTE_LIMITS["guild"]
+        self.assertLess(guess_limit / guess_per, LIMIT / PER)  # Otherwise the test passes without correction
+
+        async with aiohttp.ClientSession(trace_configs=[rate_limit_trace()]) as session:
+            async def patch(guild_id: int) -> None:
+                async with session.patch(self.api.url(f"/guilds/{guild_id}")) as response:
+                    response.raise_for_status()
+
+            edits = [Edit("guild", guild_id, lambda guild_id=guild_id: patch(guild_id)) for guild_id in (1, 2)]
+            editor = await self.run_batch(edits * (EDITS // 2))
+
+        self.assertEqual(self.api.rejected, 0)
+        self.assertEqual(self.api.accepted, EDITS)
+        self.assertEqual(editor.results["guild"][Outcome.SUCCESS], EDITS)
+
+    async def test_client_paced(self) -> None:
+        """Edits sent through discord.py's client are traced & never rejected, also after its session is recreated."""
+        http = TracedHTTPClient()
+        self.addAsyncCleanup(http.close)
+
+        with mock.patch.object(Route, "BASE", self.api.url()):
+            await http.static_login("token", bot=True)
+
+            def edit() -> Edit:
+                return Edit("guild", 1, lambda: http.request(Route("PATCH", "/guilds/{guild_id}", guild_id=1)))
+
+            await self.run_batch([edit() for _ in range(EDITS // 2)])
+
+            await http.close()
+            http.recreate()
+            editor = await self.run_batch([edit() for _ in range(EDITS // 2)])
+
+        self.assertEqual(self.api.rejected, 0)
+        self.assertEqual(self.api.accepted, EDITS)
+        self.assertEqual(editor.buckets["guild", 1].limit, LIMIT)  # Learned from the recreated session
+
+    async def test_observe_rate_limits(self) -> None:
+        """Rate limits of responses to requests made in the context are passed to the observer."""
+        observed: t.List[RateLimit] = []
+        async with aiohttp.ClientSession(trace_configs=[rate_limit_trace()]) as session:
+            with observe_rate_limits(observed.append):
+                async with session.patch(self.api.url("/guilds/1")):
+                    pass
+            async with session.patch(self.api.url("/guilds/1")):
+                pass
+
+        self.assertEqual(observed, [RateLimit("PATCH", LIMIT, LIMIT - 1, mock.ANY, "/guilds/1")])
+
+
+if __name__ == "__main__":
+    unittest.main()